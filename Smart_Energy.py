@@ -1,82 +1,154 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import random
 import os
+import atexit
 from datetime import datetime
 import plotly.express as px
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-
 from streamlit_autorefresh import st_autorefresh
 
+from smart_data import FEATURES, TARGETS, CUACA_LIST, DAYA_PERANGKAT, DAYA_LAIN, TARIF_PER_KWH
+from smart_model import load_latest_models, incremental_update
+from model_manager import ModelManager
+from forecast import horizon_features, forecast_energy
+from prediction_cache import DEFAULT_MAXSIZE, PredictionCache
+from fast_forest import as_features
+from lookup_table import SUHU_BINS, CAHAYA_BINS, load_or_build
+from smart_rules import RulesEngine, ShadowAuditor
+from log_store import LOG_BACKEND, PAGE_ROWS, labelled_log_frame, open_log_store
+from log_writer import BackgroundLogWriter
+from log_rotation import RETENTION_DAYS, RotatingCsvLogStore
+from log_export import EXPORT_FORMATS, export_bytes
+from log_aggregates import load_or_rebuild
+import model_store
+
 st.set_page_config(page_title="Smart Energy Dashboard", layout="wide")
 
 # ------------------- CACHING MODEL TRAINING -------------------
+# Rentang tabel log; "Semua" = seluruh log yang tersimpan.
+LOG_RANGES = {
+    "1 jam": pd.Timedelta(hours=1),
+    "24 jam": pd.Timedelta(days=1),
+    "7 hari": pd.Timedelta(days=7),
+    "30 hari": pd.Timedelta(days=30),
+    "Semua": None,
+}
+# Pilihan filter status perangkat di tabel log.
+FILTER_STATUS = {"Semua": None, "ON": True, "OFF": False}
+
+def with_lookup_table(model):
+    # Mode lookup: tabel dimuat/dibangun di thread training sebelum swap, jadi rerun
+    # pertama setelah swap tidak menunggu ratusan ribu prediksi forest.
+    if PREDICT_MODE == "lookup":
+        path = os.path.join(model_store.artifact_dir(model["info"]["key"]), f"lookup_{SUHU_BINS}x{CAHAYA_BINS}.npz")
+        model["lookup"] = load_or_build(model["artifact"]["models"], path)
+    return model
+
+def build_base_model():
+    # Model terbaru dari model store di disk (hasil training log terakhir jika ada); training
+    # hanya jika hash konfigurasi model dasar belum ada.
+    artifact, info = load_latest_models()
+    return with_lookup_table({"artifact": artifact, "info": info})
+
+def build_log_model():
+    # Tambah pohon dari baris log baru (warm start) di atas model log terakhir.
+    get_log_writer().flush()
+    artifact, stats = incremental_update(get_log_store())
+    info = {"key": stats["key"], "source": "log", "load_s": None, "train_s": stats["train_s"]}
+    return with_lookup_table({"artifact": artifact, "info": info})
+
+@st.cache_resource
+def get_model_manager():
+    # Satu manager untuk semua sesi; model pertama disiapkan di latar belakang.
+    manager = ModelManager()
+    manager.retrain(build_base_model, "start")
+    return manager
+
+@st.cache_resource
+def get_log_store():
+    # Satu store untuk semua sesi; file log tidak lagi ditulis ulang setiap rerun.
+    return open_log_store(LOG_BACKEND)
+
+@st.cache_resource
+def get_log_aggregates():
+    # Agregat biaya/energi seluruh log, diperbarui per batch oleh writer; dibangun dari log
+    # mentah hanya bila file agregat belum ada.
+    return load_or_rebuild(get_log_store())
+
 @st.cache_resource
-def train_ml_model():
-    data = []
-    for _ in range(1000):
-        suhu = random.uniform(20, 35)
-        jam = random.randint(0, 23)
-        penghuni = random.choice([0, 1])
-        cuaca = random.choice(["cerah", "hujan", "mendung"])
-        hari_libur = random.choice([0, 1])
-        cahaya = random.uniform(0, 100)
-        ac_on = 1 if (suhu > 30 or (suhu > 27 and cuaca == "cerah")) and penghuni else 0
-        tv_on = 1 if penghuni and ((18 <= jam <= 22) or (hari_libur and 9 <= jam <= 23)) else 0
-        lampu_on = 1 if penghuni and (jam >= 18 or jam < 6 or cahaya < 30) else 0
-        data.append([suhu, jam, penghuni, cuaca, hari_libur, cahaya, ac_on, tv_on, lampu_on])
-
-    df = pd.DataFrame(data, columns=["suhu", "jam", "penghuni", "cuaca", "hari_libur", "cahaya", "ac", "tv", "lampu"])
-
-    X = df[["suhu", "jam", "penghuni", "cuaca", "hari_libur", "cahaya"]]
-    y_ac, y_tv, y_lampu = df["ac"], df["tv"], df["lampu"]
-
-    transformer = ColumnTransformer([("cuaca", OneHotEncoder(), ["cuaca"])], remainder="passthrough")
-
-    X_train, X_test, y_ac_train, y_ac_test = train_test_split(X, y_ac, test_size=0.2, random_state=42)
-    _, _, y_tv_train, y_tv_test = train_test_split(X, y_tv, test_size=0.2, random_state=42)
-    _, _, y_lampu_train, y_lampu_test = train_test_split(X, y_lampu, test_size=0.2, random_state=42)
-
-    model_params = {"n_estimators": 100, "max_depth": 10, "random_state": 42}
-    model_ac = Pipeline([("pre", transformer), ("clf", RandomForestClassifier(**model_params))]).fit(X_train, y_ac_train)
-    model_tv = Pipeline([("pre", transformer), ("clf", RandomForestClassifier(**model_params))]).fit(X_train, y_tv_train)
-    model_lampu = Pipeline([("pre", transformer), ("clf", RandomForestClassifier(**model_params))]).fit(X_train, y_lampu_train)
-
-    acc_ac = accuracy_score(y_ac_test, model_ac.predict(X_test))
-    acc_tv = accuracy_score(y_tv_test, model_tv.predict(X_test))
-    acc_lampu = accuracy_score(y_lampu_test, model_lampu.predict(X_test))
-
-    return model_ac, model_tv, model_lampu, acc_ac, acc_tv, acc_lampu, df
+def get_log_writer():
+    # Rerun hanya memasukkan baris ke antrean; thread writer menulis per batch (group commit)
+    # dan sisa antrean di-flush saat proses berhenti.
+    writer = BackgroundLogWriter(get_log_store(), on_commit=get_log_aggregates().commit)
+    atexit.register(writer.close)
+    return writer
+
+@st.cache_resource
+def render_corr_heatmap(model_key, _corr):
+    # Heatmap dari matriks korelasi yang sudah disimpan di artefak; dirender sekali per model.
+    fig_corr, ax = plt.subplots()
+    sns.heatmap(_corr, annot=True, cmap="coolwarm", ax=ax)
+    return fig_corr
+
+# SMART_ENERGY_PREDICT_MODE: "compiled" (forest yang dikompilasi), "lookup" (tabel keputusan)
+# atau "rules" (aturan langsung, dengan sebagian prediksi dicek ulang oleh forest).
+PREDICT_MODE = os.environ.get("SMART_ENERGY_PREDICT_MODE", "compiled")
+SHADOW_RATE = float(os.environ.get("SMART_ENERGY_SHADOW_RATE", "0.1"))
+# Ukuran LRU cache prediksi yang dipakai bersama semua sesi; 0 = tanpa cache.
+CACHE_SIZE = int(os.environ.get("SMART_ENERGY_CACHE_SIZE", str(DEFAULT_MAXSIZE)))
+
+@st.cache_resource
+def load_rules_predictor(model_key, _compiled):
+    # Satu auditor per model untuk semua sesi, sehingga sampel shadow terkumpul bersama.
+    return ShadowAuditor(RulesEngine(FEATURES, {"cuaca": CUACA_LIST}), _compiled, TARGETS, SHADOW_RATE)
+
+@st.cache_resource
+def load_prediction_cache(model_key, predict_mode, _predictor):
+    # Cache baru untuk setiap model/mode, sehingga tidak pernah menyajikan prediksi model lama.
+    return PredictionCache(_predictor, maxsize=CACHE_SIZE)
 
 # ------------------- TRAIN MODEL -------------------
 st_autorefresh(interval=40000, key="auto_refresh")
 st.title("🏠 Smart Energy Dashboard")
 st.markdown("Selamat datang di sistem monitoring energi rumah pintar berbasis AI.")
 
-model_ac, model_tv, model_lampu, acc_ac, acc_tv, acc_lampu, df_all = train_ml_model()
+manager = get_model_manager()
+active = manager.active
+
+if active is None:
+    # Model belum siap: halaman tetap tampil dengan aturan dasar, tanpa menunggu training.
+    st.info("⏳ Model sedang disiapkan di latar belakang; sementara prediksi memakai aturan dasar.")
+    predictor = RulesEngine(FEATURES, {"cuaca": CUACA_LIST})
+else:
+    artifact, model_info = active["artifact"], active["info"]
+    compiled, accuracy, metrics = artifact["compiled"], artifact["accuracy"], artifact["metrics"]
+    if PREDICT_MODE == "lookup":
+        predictor = active["lookup"]
+    elif PREDICT_MODE == "rules":
+        predictor = load_rules_predictor(model_info["key"], compiled)
+    else:
+        predictor = compiled
+
+prediction_cache = None
+if active is not None and CACHE_SIZE > 0:
+    prediction_cache = load_prediction_cache(model_info["key"], PREDICT_MODE, predictor)
+serving = prediction_cache or predictor
 
 # ------------------- KONTROL ATAS -------------------
-LOG_FILE = "log_energi.csv"
-if "log" not in st.session_state:
-    st.session_state["log"] = []
-
 colA, colB = st.columns(2)
 with colA:
     if st.button("🔄 Refresh Data"):
         st.session_state["refresh_key"] = random.random()
 with colB:
     if st.button("🗑️ Reset Log Data"):
-        st.session_state["log"] = []
-        if os.path.exists(LOG_FILE):
-            os.remove(LOG_FILE)
+        if not get_log_writer().flush():
+            st.warning("Antrean log belum habis ditulis; baris yang tertunda akan masuk ke log baru.")
+        get_log_store().reset()
+        get_log_aggregates().reset()
         st.success("Log data berhasil dihapus.")
 
 # ------------------- SIMULASI SENSOR -------------------
@@ -87,17 +159,12 @@ jam = datetime.now().hour
 cuaca = random.choice(["cerah", "hujan", "mendung"])
 hari_libur = random.choice([0, 1])
 
-input_data = pd.DataFrame([{
-    "suhu": suhu,
-    "jam": jam,
-    "penghuni": penghuni_ada,
-    "cuaca": cuaca,
-    "hari_libur": hari_libur,
-    "cahaya": cahaya
-}])
-ac_status_pred = "ON" if model_ac.predict(input_data)[0] else "OFF"
-tv_status_pred = "ON" if model_tv.predict(input_data)[0] else "OFF"
-lampu_status_pred = "ON" if model_lampu.predict(input_data)[0] else "OFF"
+# Bacaan sensor cukup berupa tuple (urutan FEATURES); tidak perlu DataFrame untuk prediksi.
+reading = (suhu, jam, penghuni_ada, cuaca, hari_libur, cahaya)
+ac_pred, tv_pred, lampu_pred = serving.predict(as_features(reading))[0]
+ac_status_pred = "ON" if ac_pred else "OFF"
+tv_status_pred = "ON" if tv_pred else "OFF"
+lampu_status_pred = "ON" if lampu_pred else "OFF"
 
 # ------------------- KONTROL MANUAL -------------------
 st.markdown("### 🧑‍🔧 Kontrol Manual Perangkat")
@@ -110,12 +177,12 @@ ac_status = manual_ac if manual_ac != "Auto" else ac_status_pred
 tv_status = manual_tv if manual_tv != "Auto" else tv_status_pred
 lampu_status = manual_lampu if manual_lampu != "Auto" else lampu_status_pred
 
-daya_ac = 1500 if ac_status == "ON" else 0
-daya_tv = 100 if tv_status == "ON" else 0
-daya_lampu = 250 if lampu_status == "ON" else 0
-daya_lain = 250
+daya_ac = DAYA_PERANGKAT["ac"] if ac_status == "ON" else 0
+daya_tv = DAYA_PERANGKAT["tv"] if tv_status == "ON" else 0
+daya_lampu = DAYA_PERANGKAT["lampu"] if lampu_status == "ON" else 0
+daya_lain = DAYA_LAIN
 daya_total = daya_ac + daya_tv + daya_lampu + daya_lain
-biaya = (daya_total / 1000) * 1900
+biaya = (daya_total / 1000) * TARIF_PER_KWH
 
 # ------------------- INFO KONDISI -------------------
 st.markdown("### 📊 Kondisi Terkini")
@@ -152,89 +219,173 @@ log_entry = {
     "Daya Total (W)": round(daya_total, 1),
     "Biaya/Jam (Rp)": int(biaya)
 }
-st.session_state["log"].append(log_entry)
-df_log = pd.DataFrame(st.session_state["log"])
-df_log.to_csv(LOG_FILE, index=False)
+get_log_writer().append([log_entry])
+log_store = get_log_store()
 
 
 # ------------------- GRAFIK PREDIKSI 8 JAM -------------------
 st.markdown("### 🕐 Prediksi Energi 8 Jam Ke Depan")
-jam_list = list(range(8))
-prediksi_data = []
-
-for j in jam_list:
-    suhu = random.uniform(23, 33)
-    penghuni = 1 if (5 <= j <= 7 or 18 <= j <= 23) else 0
-    cahaya = random.uniform(70, 100) if 6 <= j <= 17 else random.uniform(0, 30)
-    cuaca = random.choice(["cerah", "mendung", "hujan"])
-    hari_libur = 0
-
-    data_input = pd.DataFrame([{
-        "suhu": suhu,
-        "jam": j,
-        "penghuni": penghuni,
-        "cuaca": cuaca,
-        "hari_libur": hari_libur,
-        "cahaya": cahaya
-    }])
-
-    ac_pred = model_ac.predict(data_input)[0]
-    tv_pred = model_tv.predict(data_input)[0]
-    lampu_pred = model_lampu.predict(data_input)[0]
-
-    daya_total = sum([
-        1500 if ac_pred == 1 else 0,
-        100 if tv_pred == 1 else 0,
-        250 if lampu_pred == 1 else 0,
-        250
-    ])
-
-    prediksi_data.append({
-        "Jam": j,
-        "Suhu (°C)": round(suhu, 1),
-        "Daya Prediksi (W)": daya_total
-    })
-
-df_prediksi = pd.DataFrame(prediksi_data)
+jam_list = np.arange(8)
+X_horizon = horizon_features(jam_list, hari_libur=0)
+_, daya_prediksi = forecast_energy(serving, X_horizon)
+
+df_prediksi = pd.DataFrame({
+    "Jam": jam_list,
+    "Suhu (°C)": X_horizon[:, FEATURES.index("suhu")].round(1),
+    "Daya Prediksi (W)": daya_prediksi,
+})
 fig = px.bar(df_prediksi, x="Jam", y="Daya Prediksi (W)", text="Daya Prediksi (W)", color="Suhu (°C)", title="Prediksi Konsumsi Energi per Jam")
 fig.update_layout(xaxis=dict(dtick=1))
 st.plotly_chart(fig, use_container_width=True)
 
 # ------------------- LOG DOWNLOAD -------------------
 st.markdown("### 🧾 Log Energi")
-st.dataframe(df_log, use_container_width=True)
-with open(LOG_FILE, "rb") as f:
-    st.download_button("⬇️ Download Log CSV", f, file_name=LOG_FILE, mime="text/csv")
-    
-    # Statistik Log Biaya
-if not df_log.empty:
-    total_biaya = df_log["Biaya/Jam (Rp)"].sum()
-    rata_rata_biaya = df_log["Biaya/Jam (Rp)"].mean()
+# Hanya satu halaman (terbaru dulu) yang diambil dari store dan dikirim ke browser; filter
+# rentang & status perangkat dijalankan di store, jadi biaya render tidak bergantung panjang log.
+col_rentang, col_ac, col_tv, col_lampu, col_halaman = st.columns(5)
+rentang = col_rentang.selectbox("Rentang log", list(LOG_RANGES), index=1)
+filter_perangkat = {}
+for col, target in zip((col_ac, col_tv, col_lampu), TARGETS):
+    pilihan = col.selectbox(target.upper(), list(FILTER_STATUS), key=f"filter_{target}")
+    if FILTER_STATUS[pilihan] is not None:
+        filter_perangkat[target] = FILTER_STATUS[pilihan]
+halaman = col_halaman.number_input("Halaman", min_value=1, step=1, key="log_page")
+since = None if LOG_RANGES[rentang] is None else datetime.now() - LOG_RANGES[rentang]
+
+df_page, total_log = log_store.page(since, None, filter_perangkat, (halaman - 1) * PAGE_ROWS, PAGE_ROWS)
+jumlah_halaman = max(1, -(-total_log // PAGE_ROWS))
+if halaman > jumlah_halaman:
+    # Filter baru membuat halaman terpilih kosong: tampilkan halaman terakhir.
+    halaman = jumlah_halaman
+    df_page, total_log = log_store.page(since, None, filter_perangkat, (halaman - 1) * PAGE_ROWS, PAGE_ROWS)
+st.dataframe(labelled_log_frame(df_page), use_container_width=True, hide_index=True)
+st.caption(f"Halaman {halaman} dari {jumlah_halaman} · {total_log:,} baris cocok, terbaru dulu")
+
+# Export dibuat saat tombol diklik (callable), streaming per chunk dari log store untuk rentang tanggal terpilih.
+col_dari, col_sampai, col_format = st.columns(3)
+tanggal_dari = col_dari.date_input("Export dari", value=datetime.now().date() - pd.Timedelta(days=7))
+tanggal_sampai = col_sampai.date_input("Sampai (inklusif)", value=datetime.now().date())
+format_export = col_format.selectbox("Format", list(EXPORT_FORMATS))
+export_mime, export_ext = EXPORT_FORMATS[format_export]
+export_start = pd.Timestamp(tanggal_dari)
+export_end = pd.Timestamp(tanggal_sampai) + pd.Timedelta(days=1)
+
+def build_export():
+    # flush() dibatasi waktu; bila store sedang gagal, export berisi baris yang sudah tertulis.
+    get_log_writer().flush()
+    return export_bytes(log_store, format_export, export_start, export_end)
+
+st.download_button(
+    "⬇️ Download Log", build_export, mime=export_mime,
+    file_name=f"log_energi_{tanggal_dari:%Y%m%d}_{tanggal_sampai:%Y%m%d}{export_ext}",
+)
+
+    # Statistik Log Biaya (agregat berjalan seluruh log, tanpa membaca ulang log)
+ringkasan = get_log_aggregates().snapshot()
+if ringkasan["count"]:
+    total_biaya = ringkasan["biaya_sum"]
+    rata_rata_biaya = ringkasan["biaya_mean"]
 
     st.markdown("#### 💸 Statistik Biaya Energi dari Log")
-    colA, colB = st.columns(2)
+    colA, colB, colC = st.columns(3)
     colA.metric("Total Biaya (Rp)", f"Rp {total_biaya:,.0f}")
     colB.metric("Rata-rata Biaya/Jam (Rp)", f"Rp {rata_rata_biaya:,.0f}")
+    colC.metric("Biaya/Jam Min–Maks (Rp)", f"{ringkasan['biaya_min']:,} – {ringkasan['biaya_max']:,}")
+    colA, colB, colC = st.columns(3)
+    colA.metric("Energi Tercatat (kWh)", f"{ringkasan['energi_kwh']:,.2f}")
+    colB.metric("Biaya Energi (Rp)", f"Rp {ringkasan['biaya_energi']:,.0f}")
+    colC.metric("Daya Rata-rata (W)", f"{ringkasan['daya_mean']:,.0f}")
+    st.caption(
+        f"{ringkasan['count']:,} baris log. Waktu ON: "
+        + ", ".join(f"{t.upper()} {jam:.1f} jam" for t, jam in ringkasan["on_jam"].items())
+    )
 
 # ------------------- SIDEBAR ANALISIS MODEL -------------------
 st.sidebar.header("📈 Evaluasi Model")
 
-st.sidebar.metric("Akurasi AC", f"{acc_ac * 100:.2f}%")
-st.sidebar.metric("Akurasi TV", f"{acc_tv * 100:.2f}%")
-st.sidebar.metric("Akurasi Lampu", f"{acc_lampu * 100:.2f}%")
-
-st.sidebar.subheader("Distribusi Target")
-st.sidebar.bar_chart(df_all[["ac", "tv", "lampu"]].apply(pd.Series.value_counts).fillna(0))
-
-st.sidebar.subheader("Heatmap Korelasi")
-fig_corr, ax = plt.subplots()
-sns.heatmap(df_all.corr(numeric_only=True), annot=True, cmap="coolwarm", ax=ax)
-st.sidebar.pyplot(fig_corr)
-
-input_features = ["suhu", "jam", "penghuni", "cuaca", "hari_libur", "cahaya"]
-st.sidebar.text(classification_report(df_all["ac"], model_ac.predict(df_all[input_features])))
-st.sidebar.text(classification_report(df_all["tv"], model_tv.predict(df_all[input_features])))
-st.sidebar.text(classification_report(df_all["lampu"], model_lampu.predict(df_all[input_features])))
+if active is None:
+    st.sidebar.info("Model belum siap.")
+else:
+    st.sidebar.metric("Akurasi AC", f"{accuracy['ac'] * 100:.2f}%")
+    st.sidebar.metric("Akurasi TV", f"{accuracy['tv'] * 100:.2f}%")
+    st.sidebar.metric("Akurasi Lampu", f"{accuracy['lampu'] * 100:.2f}%")
+    st.sidebar.caption(f"Versi model v{active['version']} ({model_info['key']}), di-swap {active['swapped_at']}")
+    if model_info["source"] == "disk":
+        st.sidebar.caption(
+            f"Dimuat dari disk dalam {model_info['load_s'] * 1000:.0f} ms "
+            f"(training awal {model_info['train_s']:.2f} s)"
+        )
+    elif model_info["source"] == "log" and model_info["load_s"] is not None:
+        st.sidebar.caption(
+            f"Model dari data log dimuat dari disk dalam {model_info['load_s'] * 1000:.0f} ms "
+            f"(training terakhir {model_info['train_s']:.2f} s)"
+        )
+    elif model_info["source"] == "log":
+        st.sidebar.caption(f"Pohon baru dari data log dilatih dalam {model_info['train_s']:.2f} s")
+    else:
+        st.sidebar.caption(f"Dilatih dalam {model_info['train_s']:.2f} s dan disimpan ke disk")
+    if PREDICT_MODE == "lookup":
+        lut_report = predictor.report
+        loss = max(lut_report[f"acc_forest_{t}"] - lut_report[f"acc_table_{t}"] for t in TARGETS)
+        st.sidebar.caption(
+            f"Mode prediksi: lookup table {predictor.suhu_bins}x{predictor.cahaya_bins} "
+            f"(akurasi hilang maks {loss * 100:.2f} poin)"
+        )
+    elif PREDICT_MODE == "rules":
+        rates = predictor.disagreement_rate()
+        st.sidebar.caption(
+            f"Mode prediksi: rules; beda dengan forest pada {predictor.checked} sampel: "
+            + ", ".join(f"{t.upper()} {rate * 100:.1f}%" for t, rate in rates.items())
+        )
+
+if prediction_cache is not None:
+    cache_stats = prediction_cache.stats()
+    st.sidebar.caption(
+        f"Cache prediksi: {cache_stats['hit_rate'] * 100:.0f}% hit "
+        f"({cache_stats['hits']} hit / {cache_stats['misses']} miss / {cache_stats['evictions']} eviksi), "
+        f"{cache_stats['size']}/{cache_stats['maxsize']} entri"
+    )
+
+if isinstance(log_store, RotatingCsvLogStore) and log_store.segments:
+    st.sidebar.caption(
+        f"Segmen log: {len(log_store.segments)} file gzip "
+        f"({sum(seg['bytes'] for seg in log_store.segments) / 1024:.0f} KB, {log_store.segments[0]['start']} "
+        f"s.d. {log_store.segments[-1]['end']}), retensi {RETENTION_DAYS:g} hari"
+    )
+
+writer_stats = get_log_writer().stats()
+if writer_stats["batches"]:
+    st.sidebar.caption(
+        f"Writer log: antrean {writer_stats['queue_depth']} (maks {writer_stats['max_depth']}), "
+        f"{writer_stats['batches']} batch, flush p50 {writer_stats['flush_ms_p50']:.1f} ms / "
+        f"maks {writer_stats['flush_ms_max']:.1f} ms"
+    )
+if writer_stats["last_error"]:
+    st.sidebar.error(f"Penulisan log gagal: {writer_stats['last_error']}")
+if writer_stats["failed_rows"] or writer_stats["dropped_rows"]:
+    st.sidebar.warning(
+        f"{writer_stats['failed_rows']} baris log dipindah ke {get_log_writer().failed_file}, "
+        f"{writer_stats['dropped_rows']} baris dibuang"
+    )
+
+# Latih ulang di latar belakang; sesi lain tetap memakai model lama sampai swap.
+if st.sidebar.button("🔁 Latih Ulang dari Log", disabled=manager.training or not ringkasan["count"]):
+    manager.retrain(build_log_model, "log")
+if manager.training:
+    st.sidebar.caption("⏳ Training model baru berjalan di latar belakang...")
+if manager.last_error:
+    st.sidebar.error(f"Training gagal: {manager.last_error}")
+
+# Distribusi, korelasi dan classification report dihitung saat training dan disimpan di artefak.
+if active is not None:
+    st.sidebar.subheader("Distribusi Target")
+    st.sidebar.bar_chart(metrics["target_counts"])
+
+    st.sidebar.subheader("Heatmap Korelasi")
+    st.sidebar.pyplot(render_corr_heatmap(model_info["key"], metrics["corr"]))
+
+    for t in TARGETS:
+        st.sidebar.text(metrics["reports"][t])
 # ------------------- FOOTER -------------------
 st.markdown("---")
 st.markdown("Copyright © 2025 - Smart Energy Dashboard by Wahyu Eko Suroso. All rights reserved")
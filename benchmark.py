@@ -0,0 +1,398 @@
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from smart_data import FEATURES, TARGETS, CUACA_LIST, generate_smart_data, generate_log_frame, daya_total
+from smart_model import TRAIN_ROWS, DATA_SEED, MODEL_PARAMS, train_models, predict_devices
+from fast_forest import SKLEARN_ROWS, features_to_array
+from forecast import horizon_calendar, horizon_features, forecast_energy
+from smart_rules import RulesEngine
+from log_parquet import ParquetLogStore
+from log_binary import BinaryLogStore
+from log_store import CsvLogWriter, typed_log_frame
+from log_writer import BackgroundLogWriter
+from log_replay import STAGES, LogReplay, build_predictor
+
+
+# ------------------- UTIL -------------------
+def measure(fn, repeat=50):
+    # Median waktu eksekusi (detik) setelah satu kali pemanasan.
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def print_table(rows):
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+# ------------------- MULTI-OUTPUT VS 3 FOREST -------------------
+def bench_multioutput(args):
+    df_eval = generate_smart_data(args.batch, seed=args.seed + 1)
+    X_one, X_batch = df_eval[FEATURES].iloc[:1], df_eval[FEATURES]
+
+    rows = []
+    for label, multi_output in (("3 forest", False), ("multi-output", True)):
+        start = time.perf_counter()
+        artifact = train_models(args.rows, args.seed, MODEL_PARAMS, multi_output=multi_output)
+        train_s = time.perf_counter() - start
+        models = artifact["models"]
+
+        y_pred = predict_devices(models, X_batch)
+        row = {
+            "model": label,
+            "train (s)": round(train_s, 3),
+            "1 baris (ms)": round(measure(lambda: predict_devices(models, X_one)) * 1000, 3),
+            f"{args.batch} baris (ms)": round(measure(lambda: predict_devices(models, X_batch), repeat=5) * 1000, 2),
+        }
+        for i, t in enumerate(TARGETS):
+            row[f"akurasi {t}"] = round(float((y_pred[:, i] == df_eval[t].to_numpy()).mean()), 4)
+        rows.append(row)
+
+    print_table(rows)
+
+
+# ------------------- COMPILED FOREST VS SKLEARN -------------------
+def bench_compiled(args):
+    artifact = train_models(args.rows, args.seed, MODEL_PARAMS)
+    models, compiled = artifact["models"], artifact["compiled"]
+    df_eval = generate_smart_data(max(args.sizes), seed=args.seed + 1)
+
+    rows = []
+    crossover = None
+    for n in args.sizes:
+        X_df = df_eval[FEATURES].iloc[:n]
+        X_arr = features_to_array(X_df)
+        repeat = 50 if n <= 100 else 5
+        traverse_s = measure(lambda: compiled.traverse(X_arr), repeat)
+        forests_s = measure(lambda: compiled.predict_forests(X_arr), repeat)
+        if crossover is None and traverse_s > forests_s:
+            crossover = n
+        rows.append({
+            "baris": n,
+            "sklearn (ms)": round(measure(lambda: predict_devices(models, X_df), repeat) * 1000, 3),
+            "traversal (ms)": round(traverse_s * 1000, 3),
+            "forest (ms)": round(forests_s * 1000, 3),
+            "compiled (ms)": round(measure(lambda: compiled.predict(X_arr), repeat) * 1000, 3),
+            "jalur": "forest" if n > SKLEARN_ROWS else "traversal",
+            "predict_one (ms)": (
+                round(measure(lambda: compiled.predict_one(tuple(X_df.iloc[0])), repeat) * 1000, 3) if n == 1 else None
+            ),
+            "identik": bool((compiled.predict(X_arr) == predict_devices(models, X_df)).all()
+                            and (compiled.traverse(X_arr) == compiled.predict_forests(X_arr)).all()),
+        })
+
+    print_table(rows)
+    # traversal = array numpy saja; forest = RandomForestClassifier pada input yang sudah di-encode.
+    print(f"\nbatch > {SKLEARN_ROWS} baris memakai forest sklearn; "
+          + (f"traversal mulai kalah pada {crossover} baris" if crossover else "traversal tidak kalah pada ukuran ini"))
+
+
+# ------------------- FORECAST HORIZON -------------------
+def _forecast_loop(models, jam_list, rng):
+    # Cara lama: satu DataFrame dan satu predict per langkah.
+    daya = []
+    for j in jam_list:
+        data_input = pd.DataFrame([{
+            "suhu": rng.uniform(23, 33),
+            "jam": j,
+            "penghuni": 1 if (5 <= j <= 7 or 18 <= j <= 23) else 0,
+            "cuaca": CUACA_LIST[rng.integers(0, 3)],
+            "hari_libur": 0,
+            "cahaya": rng.uniform(70, 100) if 6 <= j <= 17 else rng.uniform(0, 30),
+        }])
+        daya.append(daya_total(predict_devices(models, data_input))[0])
+    return daya
+
+
+def bench_forecast(args):
+    artifact = train_models(args.rows, args.seed, MODEL_PARAMS)
+    models, compiled = artifact["models"], artifact["compiled"]
+    rules = RulesEngine(FEATURES, {"cuaca": CUACA_LIST})
+    rng = np.random.default_rng(args.seed)
+
+    rows = []
+    for label, periods, freq in (("8 jam", 8, "h"), ("24 jam", 24, "h"), ("7 hari", 168, "h"),
+                                 ("1 hari per menit", 1440, "min"), ("7 hari per menit", 10080, "min")):
+        _, jam, libur = horizon_calendar("2025-07-07", periods, freq)
+        X = horizon_features(jam, libur, rng)
+        repeat = 10 if periods <= 1440 else 3
+        row = {"horizon": label, "langkah": periods}
+        row["loop lama (ms)"] = (
+            round(measure(lambda: _forecast_loop(models, jam, rng), 3) * 1000, 1) if periods <= args.max_loop else None
+        )
+        row["batch compiled (ms)"] = round(measure(lambda: forecast_energy(compiled, X), repeat) * 1000, 2)
+        row["batch rules (ms)"] = round(measure(lambda: forecast_energy(rules, X), repeat) * 1000, 3)
+        rows.append(row)
+
+    print_table(rows)
+
+
+# ------------------- LOAD GENERATOR SERVER INFERENSI -------------------
+def _get_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def _client(host, port, body, stop_at, latencies):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        conn.request("POST", "/predict", body, headers)
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def bench_server(args):
+    server = None
+    if args.port is None:
+        # Server dijalankan di proses sendiri, supaya klien tidak berebut GIL dengannya.
+        args.port = 8799
+        server = subprocess.Popen([sys.executable, "inference_server.py", "--port", str(args.port),
+                                   "--window-ms", str(args.window_ms)], stdout=subprocess.DEVNULL)
+        for _ in range(600):
+            try:
+                _get_json(args.host, args.port, "/health")
+                break
+            except OSError:
+                time.sleep(0.1)
+
+    df_eval = generate_smart_data(100, seed=args.seed + 1)
+    readings = df_eval[FEATURES].astype(object).values.tolist()
+
+    rows = []
+    try:
+        for n_clients in args.clients:
+            before = _get_json(args.host, args.port, "/stats")
+            latencies = [[] for _ in range(n_clients)]
+            stop_at = time.perf_counter() + args.duration
+            threads = [
+                threading.Thread(target=_client, args=(
+                    args.host, args.port, json.dumps({"readings": [readings[i % len(readings)]]}), stop_at, latencies[i]
+                ))
+                for i in range(n_clients)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            after = _get_json(args.host, args.port, "/stats")
+
+            lat = np.concatenate([np.array(x) for x in latencies]) * 1000
+            batches = after["batches"] - before["batches"]
+            rows.append({
+                "klien": n_clients,
+                "request/s": round(len(lat) / args.duration, 1),
+                "p50 (ms)": round(float(np.percentile(lat, 50)), 2),
+                "p99 (ms)": round(float(np.percentile(lat, 99)), 2),
+                "request/batch": round((after["requests"] - before["requests"]) / batches, 2) if batches else None,
+            })
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_table(rows)
+
+
+# ------------------- PENYIMPANAN LOG: CSV VS PARQUET VS BINER -------------------
+def _csv_range(path, start, end, chunk_rows=100_000):
+    # CSV tidak punya indeks: rentang waktu apa pun tetap mem-parse seluruh file.
+    parts = []
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        waktu = pd.to_datetime(chunk["Waktu"])
+        parts.append(chunk[(waktu >= start) & (waktu < end if end is not None else True)])
+    return pd.concat(parts, ignore_index=True)
+
+
+def bench_logstore(args):
+    periods = int(pd.Timedelta(days=args.days) / pd.Timedelta(args.freq))
+    df = generate_log_frame("2025-01-01", periods, args.freq, args.seed)
+    mid = pd.Timestamp("2025-01-01") + pd.Timedelta(days=args.days // 2)
+    queries = [
+        ("semua baris", None, None, None),
+        ("1 hari", mid, mid + pd.Timedelta(days=1), None),
+        ("7 hari", mid, mid + pd.Timedelta(days=7), None),
+        ("1 kolom setahun", None, None, ["Biaya/Jam (Rp)"]),
+        ("24 jam terakhir", df["Waktu"].iloc[-1], None, None),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "log.csv")
+        store = ParquetLogStore(os.path.join(tmp, "parquet"))
+        binary = BinaryLogStore(os.path.join(tmp, "log.bin"))
+
+        start = time.perf_counter()
+        df.to_csv(csv_path, index=False)
+        csv_write = time.perf_counter() - start
+        start = time.perf_counter()
+        store.append(df)
+        store.compact()
+        parquet_write = time.perf_counter() - start
+        start = time.perf_counter()
+        binary.append(df)
+        binary_write = time.perf_counter() - start
+
+        print(f"{len(df):,} baris ({args.days} hari per {args.freq}): "
+              f"CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, tulis {csv_write:.2f} s | "
+              f"Parquet {store.size_bytes() / 1e6:.1f} MB, tulis {parquet_write:.2f} s | "
+              f"biner {os.path.getsize(binary.path) / 1e6:.1f} MB, tulis {binary_write:.2f} s\n")
+
+        rows = []
+        for label, q_start, q_end, columns in queries:
+            if label == "24 jam terakhir":
+                q_start = pd.Timestamp(q_start) - pd.Timedelta(hours=24) + pd.Timedelta(seconds=1)
+            if q_start is None:
+                csv_fn = lambda: pd.read_csv(csv_path, usecols=columns)
+            else:
+                csv_fn = lambda: _csv_range(csv_path, q_start, q_end)
+            pq_columns = ["biaya"] if columns else None
+            pq_fn = lambda: store.read_range(q_start, q_end, columns=pq_columns)
+            # Biner: slice memmap hasil binary search (tanpa salinan) dan hasil decode ke frame.
+            bin_slice_fn = lambda: binary.rows(q_start, q_end)["biaya" if columns else "waktu"]
+            bin_fn = lambda: binary.read_range(q_start, q_end, columns=pq_columns)
+            rows.append({
+                "query": label,
+                "baris": len(pq_fn()),
+                "CSV (ms)": round(measure(csv_fn, args.repeat) * 1000, 1),
+                "Parquet (ms)": round(measure(pq_fn, args.repeat) * 1000, 1),
+                "biner slice (ms)": round(measure(bin_slice_fn, args.repeat) * 1000, 3),
+                "biner frame (ms)": round(measure(bin_fn, args.repeat) * 1000, 1),
+            })
+        print_table(rows)
+
+
+# ------------------- WRITER LOG: SINKRON VS LATAR BELAKANG -------------------
+class _SlowStore:
+    # Store CSV sungguhan dengan tambahan latensi per penulisan, meniru disk yang lambat.
+    def __init__(self, store, delay_s):
+        self.store = store
+        self.path = store.path
+        self.delay_s = delay_s
+
+    def append(self, records):
+        time.sleep(self.delay_s)
+        self.store.append(records)
+
+
+def bench_logwriter(args):
+    records = generate_log_frame("2025-01-01", args.records, seed=args.seed).to_dict("records")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for delay_ms in args.delay_ms:
+            for label in ("sinkron", "latar belakang"):
+                store = _SlowStore(CsvLogWriter(os.path.join(tmp, f"{label}-{delay_ms}.csv")), delay_ms / 1000)
+                writer = BackgroundLogWriter(store, flush_s=args.flush_s) if label != "sinkron" else store
+
+                lat = []
+                for record in records:
+                    start = time.perf_counter()
+                    writer.append([record])
+                    lat.append(time.perf_counter() - start)
+                    time.sleep(args.interval_ms / 1000)
+                row = {
+                    "disk +ms": delay_ms,
+                    "writer": label,
+                    "append p50 (ms)": round(statistics.median(lat) * 1000, 3),
+                    "append p99 (ms)": round(float(np.percentile(lat, 99)) * 1000, 3),
+                }
+                if label != "sinkron":
+                    writer.close()
+                    stats = writer.stats()
+                    row["baris/batch"] = round(stats["rows_per_batch"], 1)
+                    row["antrean maks"] = stats["max_depth"]
+                    row["flush p50 (ms)"] = round(stats["flush_ms_p50"], 2)
+                rows.append(row)
+
+    print_table(rows)
+
+
+
+# ------------------- REPLAY PIPELINE -------------------
+def bench_replay(args):
+    # Log sintetis diputar ulang secepat mungkin per mode prediksi; baris/s per tahap.
+    df_log = generate_log_frame("2025-01-01", args.records, seed=args.seed)
+    chunks = [typed_log_frame(df_log)]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            store = CsvLogWriter(os.path.join(tmp, f"replay-{mode}.csv"))
+            report = LogReplay(build_predictor(mode, args.cache_size), store).run(chunks)
+            store.close()
+            row = {"mode": mode, "baris/s": round(report["rows_per_s"])}
+            row.update({f"{s} baris/s": None if report["stage_rows_per_s"][s] is None else round(report["stage_rows_per_s"][s])
+                        for s in STAGES})
+            rows.append(row)
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Smart Energy")
+    parser.add_argument("--rows", type=int, default=TRAIN_ROWS, help="jumlah baris training")
+    parser.add_argument("--seed", type=int, default=DATA_SEED)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("multioutput", help="latensi & akurasi multi-output vs 3 forest terpisah")
+    p.add_argument("--batch", type=int, default=10000)
+    p.set_defaults(func=bench_multioutput)
+
+    p = sub.add_parser("compiled", help="latensi compiled forest vs pipeline sklearn")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 128, 512, 1024, 2048, 4096, 10000])
+    p.set_defaults(func=bench_compiled)
+
+    p = sub.add_parser("forecast", help="prediksi horizon: loop per langkah vs satu batch")
+    p.add_argument("--max-loop", type=int, default=168, help="horizon terpanjang yang diukur dengan loop lama")
+    p.set_defaults(func=bench_forecast)
+
+    p = sub.add_parser("server", help="throughput & p99 server inferensi untuk 1/10/100 klien")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=None, help="server yang sudah berjalan; default: jalankan sendiri")
+    p.add_argument("--window-ms", type=float, default=2.0)
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    p.add_argument("--duration", type=float, default=5.0, help="detik per tingkat konkurensi")
+    p.set_defaults(func=bench_server)
+
+    p = sub.add_parser("logstore", help="ukuran & waktu baca log: CSV vs Parquet per tanggal vs biner")
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--freq", default="40s")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_logstore)
+
+    p = sub.add_parser("logwriter", help="latensi append log: sinkron vs writer latar belakang, disk lambat")
+    p.add_argument("--records", type=int, default=200)
+    p.add_argument("--interval-ms", type=float, default=5.0, help="jeda antar append (meniru rerun)")
+    p.add_argument("--delay-ms", type=float, nargs="+", default=[0, 20, 100], help="latensi disk tambahan")
+    p.add_argument("--flush-s", type=float, default=0.2)
+    p.set_defaults(func=bench_logwriter)
+
+    p = sub.add_parser("replay", help="throughput replay log per tahap (baca/prediksi/biaya/log) per mode prediksi")
+    p.add_argument("--records", type=int, default=20000)
+    p.add_argument("--modes", nargs="+", default=["compiled", "lookup", "rules"])
+    p.add_argument("--cache-size", type=int, default=0)
+    p.set_defaults(func=bench_replay)
+
+    args = parser.parse_args()
+    args.func(args)
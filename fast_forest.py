@@ -0,0 +1,327 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+
+from smart_data import FEATURES, TARGETS, CUACA_LIST
+
+CUACA_COL = FEATURES.index("cuaca")
+CUACA_CODE = {name: code for code, name in enumerate(CUACA_LIST)}
+CHUNK_ROWS = 128
+# Di atas jumlah baris ini traversal numpy kalah dari loop C sklearn (lihat
+# `benchmark.py compiled`), jadi batch besar diserahkan ke forest aslinya.
+SKLEARN_ROWS = 1024
+
+# Buffer kerja predict_one per thread, supaya satu instance aman dipakai banyak sesi.
+_workspace = threading.local()
+
+
+# ------------------- ENCODING FITUR -------------------
+def features_to_array(df):
+    # DataFrame dengan kolom FEATURES -> array float64 (n, 6), cuaca sebagai kode CUACA_LIST.
+    X = np.empty((len(df), len(FEATURES)), dtype=np.float64)
+    for i, col in enumerate(FEATURES):
+        if col == "cuaca":
+            X[:, i] = cuaca_codes(df[col])
+        else:
+            X[:, i] = df[col].to_numpy(dtype=np.float64)
+    return X
+
+
+def as_features(data):
+    # Tuple/list (satu bacaan, urutan FEATURES), dict, list bacaan, array 2-D atau
+    # DataFrame -> array float64 (n, 6). cuaca boleh string atau kode CUACA_LIST.
+    # Bacaan yang panjangnya salah, berisi NaN/None atau cuaca tak dikenal -> ValueError.
+    if isinstance(data, pd.DataFrame):
+        return _check_features(features_to_array(data))
+    if isinstance(data, dict):
+        data = [data[f] for f in FEATURES]
+    if isinstance(data, np.ndarray) and data.dtype.kind in "iuf":
+        X = np.asarray(data, dtype=np.float64)
+        return _check_features(X[None, :] if X.ndim == 1 else X)
+    if isinstance(data, np.ndarray) and data.dtype.kind in "US":
+        return _check_features(_string_array_features(data))
+    if len(data) == 0:
+        raise ValueError("tidak ada bacaan")
+
+    rows = [data] if not isinstance(data[0], (tuple, list, dict, np.ndarray)) else data
+    X = np.empty((len(rows), len(FEATURES)), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if isinstance(row, dict):
+            row = [row[f] for f in FEATURES]
+        if len(row) != len(FEATURES):
+            raise ValueError(f"bacaan ke-{i} berisi {len(row)} nilai, seharusnya {len(FEATURES)} ({', '.join(FEATURES)})")
+        for j, value in enumerate(row):
+            if isinstance(value, str):
+                if value not in CUACA_CODE:
+                    raise ValueError(f"cuaca tidak dikenal pada bacaan ke-{i}: {value!r}")
+                value = CUACA_CODE[value]
+            elif value is None:
+                raise ValueError(f"{FEATURES[j]} kosong pada bacaan ke-{i}")
+            X[i, j] = value
+    return _check_features(X)
+
+
+def _string_array_features(data):
+    # np.array([(25.0, 14, 1, "cerah", 0, 50.0)]) berdtype string: kolom angka di-parse,
+    # cuaca boleh nama atau kode.
+    data = np.char.decode(data) if data.dtype.kind == "S" else data
+    data = data[None, :] if data.ndim == 1 else data
+    if data.ndim != 2 or data.shape[1] != len(FEATURES):
+        raise ValueError(f"fitur harus berbentuk (n, {len(FEATURES)}), bukan {data.shape}")
+    X = np.empty(data.shape, dtype=np.float64)
+    for j, name in enumerate(FEATURES):
+        column = data[:, j].tolist()
+        if name == "cuaca":
+            column = [CUACA_CODE.get(value, value) for value in column]
+        try:
+            X[:, j] = np.asarray(column, dtype=np.float64)
+        except ValueError:
+            bad = next(v for v in column if not _is_number(v))
+            raise ValueError(f"{name} tidak valid: {bad!r}") from None
+    return X
+
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _check_features(X):
+    if X.ndim != 2 or X.shape[1] != len(FEATURES):
+        raise ValueError(f"fitur harus berbentuk (n, {len(FEATURES)}), bukan {X.shape}")
+    if not np.isfinite(X).all():
+        i, j = np.argwhere(~np.isfinite(X))[0]
+        raise ValueError(f"{FEATURES[j]} tidak valid pada bacaan ke-{i}: {X[i, j]}")
+    cuaca = X[:, CUACA_COL]
+    bad = (cuaca != np.floor(cuaca)) | (cuaca < 0) | (cuaca >= len(CUACA_LIST))
+    if bad.any():
+        i = int(np.argmax(bad))
+        raise ValueError(f"kode cuaca tidak dikenal pada bacaan ke-{i}: {cuaca[i]}")
+    return X
+
+
+def cuaca_codes(series):
+    codes = np.full(len(series), -1, dtype=np.int64)
+    values = series.astype(str).to_numpy()
+    for code, name in enumerate(CUACA_LIST):
+        codes[values == name] = code
+    return codes
+
+
+def _encoding_plan(pre):
+    # Urutan kolom keluaran ColumnTransformer: one-hot cuaca lalu kolom passthrough.
+    onehot_codes, passthrough = [], []
+    for name, trans, cols in pre.transformers_:
+        if isinstance(trans, OneHotEncoder):
+            onehot_codes.extend(CUACA_LIST.index(c) for c in trans.categories_[0])
+        elif not (isinstance(trans, str) and trans == "drop"):
+            # Remainder "passthrough" (versi sklearn baru membungkusnya dalam FunctionTransformer).
+            passthrough.extend(FEATURES.index(c) if isinstance(c, str) else int(c) for c in cols)
+    return np.array(onehot_codes, dtype=np.int64), np.array(passthrough, dtype=np.int64)
+
+
+# ------------------- COMPILER -------------------
+class CompiledForest:
+    # Semua pohon dari satu atau beberapa RandomForestClassifier diratakan ke array
+    # node yang bersebelahan; setiap "head" adalah satu output (ac/tv/lampu) yang
+    # dirata-rata dari rentang pohonnya sendiri, persis seperti predict_proba sklearn.
+    def __init__(self, onehot_codes, passthrough, feature, threshold, children, value, roots, depth, heads,
+                 forests=None):
+        self.onehot_codes = onehot_codes
+        self.passthrough = passthrough
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.heads = heads
+        # RandomForestClassifier asli (urutan sama dengan heads) untuk batch > SKLEARN_ROWS.
+        self.forests = forests
+
+    def encode(self, X):
+        # Sama dengan ColumnTransformer + cast float32 yang dilakukan sklearn sebelum traversal.
+        X = np.asarray(X, dtype=np.float64)
+        n_onehot = len(self.onehot_codes)
+        X_enc = np.empty((X.shape[0], n_onehot + len(self.passthrough)), dtype=np.float32)
+        X_enc[:, :n_onehot] = X[:, CUACA_COL, None] == self.onehot_codes
+        X_enc[:, n_onehot:] = X[:, self.passthrough]
+        return X_enc
+
+    def apply(self, X_enc):
+        # Traversal semua pohon sekaligus; hasil (n_trees, n) berisi indeks leaf global.
+        # children[2 * node] adalah anak kiri, children[2 * node + 1] anak kanan.
+        n, n_cols = X_enc.shape
+        X_flat = X_enc.ravel()
+        row_base = (np.arange(n, dtype=np.int32) * n_cols)[None, :]
+        node = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.depth):
+            x = np.take(X_flat, np.take(self.feature, node) + row_base)
+            node = np.take(self.children, 2 * node + (x > np.take(self.threshold, node)))
+        return node
+
+    def predict(self, features):
+        features = as_features(features)
+        if self.forests is not None and features.shape[0] > SKLEARN_ROWS:
+            return self.predict_forests(features)
+        return self.traverse(features)
+
+    def traverse(self, features):
+        # Selalu lewat traversal numpy, berapa pun jumlah barisnya.
+        features = as_features(features)
+        out = np.empty((features.shape[0], len(self.heads)), dtype=np.int64)
+        for start in range(0, features.shape[0], CHUNK_ROWS):
+            chunk = slice(start, start + CHUNK_ROWS)
+            out[chunk] = self._predict_chunk(features[chunk])
+        return out
+
+    def _predict_chunk(self, features):
+        node = self.apply(self.encode(features))
+        out = np.empty((features.shape[0], len(self.heads)), dtype=np.int64)
+        for k, (t0, t1, c0, classes) in enumerate(self.heads):
+            # Penjumlahan berurutan per pohon (axis 0) agar pembulatan identik dengan sklearn.
+            proba = self.value[node[t0:t1], c0:c0 + len(classes)].sum(axis=0)
+            proba /= t1 - t0
+            out[:, k] = classes[np.argmax(proba, axis=1)]
+        return out
+
+    def predict_forests(self, features):
+        # Input yang sudah di-encode dilewatkan langsung ke forest, tanpa ColumnTransformer.
+        X_enc = self.encode(features)
+        out = np.empty((features.shape[0], len(self.heads)), dtype=np.int64)
+        k = 0
+        for clf in self.forests:
+            pred = np.asarray(clf.predict(X_enc)).reshape(features.shape[0], -1)
+            out[:, k:k + pred.shape[1]] = pred
+            k += pred.shape[1]
+        return out
+
+
+    # ------------------- FAST PATH SATU BACAAN -------------------
+    def _buffers(self):
+        cache = getattr(_workspace, "buffers", None)
+        if cache is None:
+            cache = _workspace.buffers = weakref.WeakKeyDictionary()
+        buf = cache.get(self)
+        if buf is None:
+            n_trees, width = len(self.roots), self.value.shape[1]
+            buf = cache[self] = {
+                "x": np.empty(len(self.onehot_codes) + len(self.passthrough), dtype=np.float32),
+                "node": np.empty(n_trees, dtype=np.int32),
+                "idx": np.empty(n_trees, dtype=np.int32),
+                "xv": np.empty(n_trees, dtype=np.float32),
+                "thr": np.empty(n_trees, dtype=np.float64),
+                "right": np.empty(n_trees, dtype=bool),
+                "leaf": np.empty((n_trees, width), dtype=np.float64),
+                "proba": np.empty(width, dtype=np.float64),
+            }
+        return buf
+
+    def predict_one(self, reading, out=None):
+        # Satu bacaan (tuple urutan FEATURES atau dict) -> status (ac, tv, lampu).
+        # Semua array kerja dipakai ulang; satu-satunya alokasi adalah `out` jika tidak diberikan.
+        if isinstance(reading, dict):
+            reading = [reading[f] for f in FEATURES]
+        if out is None:
+            out = np.empty(len(self.heads), dtype=np.int64)
+        b = self._buffers()
+        x, node, idx, xv, thr, right = b["x"], b["node"], b["idx"], b["xv"], b["thr"], b["right"]
+
+        cuaca = reading[CUACA_COL]
+        cuaca = CUACA_CODE[cuaca] if isinstance(cuaca, str) else cuaca
+        n_onehot = len(self.onehot_codes)
+        for k in range(n_onehot):
+            x[k] = cuaca == self.onehot_codes[k]
+        for k in range(len(self.passthrough)):
+            x[n_onehot + k] = reading[self.passthrough[k]]
+
+        node[:] = self.roots
+        for _ in range(self.depth):
+            np.take(self.feature, node, out=idx)
+            np.take(x, idx, out=xv)
+            np.take(self.threshold, node, out=thr)
+            np.greater(xv, thr, out=right)
+            np.multiply(node, 2, out=idx)
+            np.add(idx, right, out=idx)
+            np.take(self.children, idx, out=node)
+
+        leaf, proba = b["leaf"], b["proba"]
+        np.take(self.value, node, axis=0, out=leaf)
+        for k, (t0, t1, c0, classes) in enumerate(self.heads):
+            p = proba[:len(classes)]
+            np.sum(leaf[t0:t1, c0:c0 + len(classes)], axis=0, out=p)
+            p /= t1 - t0
+            out[k] = classes[p.argmax()]
+        return out
+
+
+def compile_models(models):
+    # `models` adalah dict dari smart_model.train_models: {"multi": pipe} atau {"ac": pipe, ...}.
+    pipes = [models["multi"]] if "multi" in models else [models[t] for t in TARGETS]
+    onehot_codes, passthrough = _encoding_plan(pipes[0].named_steps["pre"])
+
+    estimators = []
+    output_slots = []
+    forests = [pipe.named_steps["clf"] for pipe in pipes]
+    for clf in forests:
+        classes = clf.classes_ if clf.n_outputs_ > 1 else [clf.classes_]
+        output_slots.append((len(estimators), len(clf.estimators_), [np.asarray(c) for c in classes]))
+        estimators.extend(clf.estimators_)
+
+    width = max(sum(len(c) for c in classes) for _, _, classes in output_slots)
+    feature, threshold, children, value, roots, depth = [], [], [], [], [], 0
+    offset = 0
+    for est in estimators:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        idx = np.arange(offset, offset + n)
+
+        # Leaf menunjuk ke dirinya sendiri sehingga traversal cukup diulang sebanyak depth.
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left = np.where(is_leaf, idx, tree.children_left + offset)
+        right = np.where(is_leaf, idx, tree.children_right + offset)
+        children.append(np.stack([left, right], axis=1).ravel())
+
+        # Probabilitas leaf dinormalisasi per output seperti DecisionTreeClassifier.predict_proba.
+        proba = np.zeros((n, width))
+        c0 = 0
+        for o in range(tree.n_outputs):
+            n_classes = tree.n_classes[o]
+            v = tree.value[:, o, :n_classes]
+            normalizer = v.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            proba[:, c0:c0 + n_classes] = v / normalizer
+            c0 += n_classes
+        value.append(proba)
+
+        roots.append(offset)
+        depth = max(depth, tree.max_depth)
+        offset += n
+
+    heads = []
+    for t0, n_trees, classes in output_slots:
+        c0 = 0
+        for c in classes:
+            heads.append((t0, t0 + n_trees, c0, c))
+            c0 += len(c)
+
+    return CompiledForest(
+        onehot_codes,
+        passthrough,
+        np.concatenate(feature).astype(np.int32),
+        np.concatenate(threshold),
+        np.concatenate(children).astype(np.int32),
+        np.concatenate(value),
+        np.array(roots, dtype=np.int32),
+        depth,
+        heads,
+        forests,
+    )
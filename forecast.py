@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from smart_data import FEATURES, CUACA_LIST, daya_total
+
+# ------------------- SKENARIO HORIZON -------------------
+def horizon_calendar(start, periods, freq="h"):
+    # Jam dan hari libur (Sabtu/Minggu) untuk setiap langkah horizon, mis. 24 x "h",
+    # 7 hari = 168 x "h", atau per menit = 1440 x "min".
+    waktu = pd.date_range(start, periods=periods, freq=freq)
+    return waktu, waktu.hour.to_numpy(), (waktu.dayofweek >= 5).astype(np.int64)
+
+
+def horizon_features(jam, hari_libur=0, rng=None):
+    # Skenario sensor untuk seluruh horizon sekaligus, dengan aturan yang sama seperti
+    # loop per jam yang lama: penghuni ada pagi & malam, cahaya terang di siang hari.
+    rng = rng or np.random.default_rng()
+    jam = np.asarray(jam)
+    n = len(jam)
+    siang = (6 <= jam) & (jam <= 17)
+
+    X = np.empty((n, len(FEATURES)), dtype=np.float64)
+    X[:, FEATURES.index("suhu")] = rng.uniform(23, 33, n)
+    X[:, FEATURES.index("jam")] = jam
+    X[:, FEATURES.index("penghuni")] = ((5 <= jam) & (jam <= 7)) | ((18 <= jam) & (jam <= 23))
+    X[:, FEATURES.index("cuaca")] = rng.integers(0, len(CUACA_LIST), n)
+    X[:, FEATURES.index("hari_libur")] = np.broadcast_to(hari_libur, n)
+    X[:, FEATURES.index("cahaya")] = np.where(siang, rng.uniform(70, 100, n), rng.uniform(0, 30, n))
+    return X
+
+
+# ------------------- PREDIKSI ENERGI -------------------
+def forecast_energy(predictor, X):
+    # Satu panggilan predict untuk semua langkah dan semua perangkat; daya dihitung dengan array.
+    states = predictor.predict(X)
+    return states, daya_total(states)
@@ -0,0 +1,161 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from fast_forest import as_features
+from smart_data import TARGETS
+from smart_model import load_or_train_models
+
+# ------------------- KONFIGURASI SERVER -------------------
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_WINDOW_MS = 2.0
+MAX_BATCH_ROWS = 1024
+
+
+# ------------------- MICRO-BATCHING -------------------
+class MicroBatcher:
+    # Permintaan dari banyak klien dikumpulkan selama `window_ms` sejak permintaan
+    # pertama masuk, lalu dijawab dengan satu panggilan predict untuk semua baris.
+    def __init__(self, predictor, window_ms=BATCH_WINDOW_MS, max_rows=MAX_BATCH_ROWS):
+        self.predictor = predictor
+        self.window_s = window_ms / 1000
+        self.max_rows = max_rows
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, X):
+        future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def predict(self, X, timeout=None):
+        return self.submit(as_features(X)).result(timeout)
+
+    def _collect(self):
+        items = [self._queue.get()]
+        n_rows = len(items[0][0])
+        deadline = time.perf_counter() + self.window_s
+        while n_rows < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                pred = self.predictor.predict(np.concatenate([X for X, _ in items]))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for X, future in items:
+                future.set_result(pred[start:start + len(X)])
+                start += len(X)
+            self.batches += 1
+            self.requests += len(items)
+            self.rows += len(pred)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "rows": self.rows,
+            "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+# ------------------- HTTP -------------------
+class InferenceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, supaya klien tidak membuka koneksi baru untuk setiap prediksi, dan
+    # TCP_NODELAY agar respons kecil tidak tertahan Nagle + delayed ACK (~40 ms).
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "model": self.server.model_key})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.batcher.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            X = as_features(payload["readings"])
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            self._send_json(400, {"error": f"input tidak valid: {e}"})
+            return
+        try:
+            states = self.server.batcher.submit(X).result()
+        except Exception as e:
+            self._send_json(500, {"error": f"prediksi gagal: {e}"})
+            return
+        self._send_json(200, {"targets": TARGETS, "states": states.tolist(), "model": self.server.model_key})
+
+    def log_message(self, format, *args):
+        # Tanpa log per request; di bawah beban tinggi ini sendiri jadi bottleneck.
+        pass
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog default (5) terlalu kecil untuk ratusan klien yang terhubung bersamaan.
+    request_queue_size = 1024
+
+
+def make_server(host=HOST, port=PORT, window_ms=BATCH_WINDOW_MS, max_rows=MAX_BATCH_ROWS):
+    artifact, info = load_or_train_models()
+    server = InferenceServer((host, port), InferenceHandler)
+    server.model_key = info["key"]
+    server.batcher = MicroBatcher(artifact["compiled"], window_ms, max_rows)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server inferensi lokal dengan micro-batching")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--max-rows", type=int, default=MAX_BATCH_ROWS)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.window_ms, args.max_rows)
+    print(f"Server inferensi model {server.model_key} di http://{args.host}:{args.port} "
+          f"(window {args.window_ms} ms)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer dihentikan.")
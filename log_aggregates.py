@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from log_store import LOG_BACKEND, open_log_store, typed_log_frame
+from smart_data import TARGETS, TARIF_PER_KWH
+
+# ------------------- AGREGAT LOG BERJALAN -------------------
+# Selisih waktu antar baris lebih dari ini (mis. dashboard mati) tidak dihitung sebagai
+# waktu nyala/energi; 3 x interval autorefresh 40 s.
+MAX_GAP_S = 120
+# Field yang disimpan di file agregat (selain status/daya baris terakhir).
+STATE_KEYS = ("count", "biaya_sum", "biaya_min", "biaya_max", "daya_sum", "daya_min", "daya_max",
+              "energi_wh", "on_count", "on_s", "first_waktu", "last_waktu")
+
+
+def aggregates_path(store):
+    # File agregat diletakkan di samping log: log_energi.csv -> log_energi.csv.agg.json.
+    return f"{getattr(store, 'path', None) or store.root}.agg.json"
+
+
+class LogAggregates:
+    # Statistik seluruh log yang diperbarui per baris baru (O(1) per baris, tanpa membaca
+    # ulang log) dan disimpan sebagai JSON kecil di samping log. Waktu nyala dan energi
+    # dihitung dari status/daya baris sebelumnya selama selang ke baris berikutnya.
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._store = None
+        self._expired = False
+        self.reset(save=False)
+
+    def reset(self, save=True):
+        with self._lock:
+            self.count = 0
+            self.biaya_sum = 0
+            self.biaya_min = None
+            self.biaya_max = None
+            self.daya_sum = 0.0
+            self.daya_min = None
+            self.daya_max = None
+            self.energi_wh = 0.0
+            self.on_count = {t: 0 for t in TARGETS}
+            self.on_s = {t: 0 for t in TARGETS}
+            self.first_waktu = None
+            self.last_waktu = None
+            self._last_state = None
+            self._last_daya = None
+        if save:
+            self.save()
+
+    def update_frame(self, df):
+        # `df`: frame bertipe (typed_log_frame / iter_chunks), urut waktu.
+        if df.empty:
+            return
+        t = df["waktu"].to_numpy("datetime64[s]").astype(np.int64)
+        states = df[TARGETS].to_numpy().astype(np.int64)
+        daya = df["daya"].to_numpy(dtype=np.float64)
+        biaya = df["biaya"].to_numpy(dtype=np.int64)
+
+        with self._lock:
+            # Baris pertama batch memakai baris terakhir batch sebelumnya sebagai pendahulu.
+            prev_t = np.concatenate([[self.last_waktu if self.last_waktu is not None else t[0]], t[:-1]])
+            prev_states = np.vstack([[self._last_state if self._last_state is not None else [0] * len(TARGETS)],
+                                     states[:-1]])
+            prev_daya = np.concatenate([[self._last_daya or 0.0], daya[:-1]])
+            dt = t - prev_t
+            dt = np.where((dt > 0) & (dt <= MAX_GAP_S), dt, 0)
+
+            self.count += len(df)
+            self.biaya_sum += int(biaya.sum())
+            self.biaya_min = int(min(biaya.min(), self.biaya_min if self.biaya_min is not None else biaya.min()))
+            self.biaya_max = int(max(biaya.max(), self.biaya_max if self.biaya_max is not None else biaya.max()))
+            self.daya_sum += float(daya.sum())
+            self.daya_min = float(min(daya.min(), self.daya_min if self.daya_min is not None else daya.min()))
+            self.daya_max = float(max(daya.max(), self.daya_max if self.daya_max is not None else daya.max()))
+            self.energi_wh += float((dt * prev_daya).sum()) / 3600
+            for i, target in enumerate(TARGETS):
+                self.on_count[target] += int(states[:, i].sum())
+                self.on_s[target] += int((dt * prev_states[:, i]).sum())
+            self.first_waktu = int(t[0]) if self.first_waktu is None else self.first_waktu
+            self.last_waktu = int(t[-1])
+            self._last_state = states[-1].tolist()
+            self._last_daya = float(daya[-1])
+
+    def update(self, records):
+        # Baris berlabel (dict LOG_COLUMNS), mis. batch yang baru ditulis BackgroundLogWriter.
+        self.update_frame(typed_log_frame(pd.DataFrame(records)))
+
+    def commit(self, records):
+        if self._expired:
+            # Retensi menghapus segmen saat batch ini ditulis; batch sudah ada di store,
+            # jadi cukup hitung ulang dari log yang tersisa.
+            self._expired = False
+            self._replace_with(LogAggregates.rebuild(self._store))
+        else:
+            self.update(records)
+        self.save()
+
+    def follow_retention(self, store):
+        # Store berotasi (RotatingCsvLogStore) memanggil on_expire saat retensi menghapus
+        # segmen; total yang masih memuat baris itu dihitung ulang pada commit berikutnya.
+        if hasattr(store, "on_expire"):
+            self._store = store
+            store.on_expire = self._mark_expired
+        return self
+
+    def _mark_expired(self, segments):
+        self._expired = True
+
+    def _replace_with(self, other):
+        with self._lock:
+            for key in STATE_KEYS:
+                setattr(self, key, getattr(other, key))
+            self._last_state = other._last_state
+            self._last_daya = other._last_daya
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "biaya_sum": self.biaya_sum,
+                "biaya_mean": self.biaya_sum / self.count if self.count else 0.0,
+                "biaya_min": self.biaya_min,
+                "biaya_max": self.biaya_max,
+                "daya_sum": self.daya_sum,
+                "daya_mean": self.daya_sum / self.count if self.count else 0.0,
+                "daya_min": self.daya_min,
+                "daya_max": self.daya_max,
+                "energi_kwh": self.energi_wh / 1000,
+                "biaya_energi": self.energi_wh / 1000 * TARIF_PER_KWH,
+                "on_count": dict(self.on_count),
+                "on_jam": {t: s / 3600 for t, s in self.on_s.items()},
+                "first_waktu": self.first_waktu,
+                "last_waktu": self.last_waktu,
+                "last_state": self._last_state,
+                "last_daya": self._last_daya,
+            }
+
+    # --- persistensi ---
+    def save(self):
+        if self.path is None:
+            return
+        state = self.snapshot()
+        state["on_s"] = dict(self.on_s)
+        state["energi_wh"] = self.energi_wh
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    @classmethod
+    def load(cls, path):
+        agg = cls(path)
+        with open(path) as f:
+            state = json.load(f)
+        for key in STATE_KEYS:
+            setattr(agg, key, state[key])
+        agg._last_state = state["last_state"]
+        agg._last_daya = state["last_daya"]
+        return agg
+
+    @classmethod
+    def rebuild(cls, store, path=None):
+        # Hitung ulang dari log mentah (mis. setelah crash di antara tulis log dan tulis agregat).
+        agg = cls(path)
+        for chunk in store.iter_chunks():
+            agg.update_frame(chunk)
+        agg.save()
+        return agg
+
+
+def load_or_rebuild(store):
+    path = aggregates_path(store)
+    if os.path.exists(path):
+        return LogAggregates.load(path).follow_retention(store)
+    return LogAggregates.rebuild(store, path).follow_retention(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agregat biaya & energi log")
+    parser.add_argument("--backend", default=LOG_BACKEND, choices=["csv", "sqlite", "binary", "parquet"])
+    parser.add_argument("--rebuild", action="store_true", help="hitung ulang dari log mentah")
+    args = parser.parse_args()
+
+    store = open_log_store(args.backend)
+    start = time.perf_counter()
+    agg = LogAggregates.rebuild(store, aggregates_path(store)) if args.rebuild else load_or_rebuild(store)
+    elapsed = time.perf_counter() - start
+    s = agg.snapshot()
+    print(f"Agregat    : {aggregates_path(store)} ({elapsed * 1000:.0f} ms)")
+    print(f"Baris      : {s['count']:,}")
+    print(f"Biaya/Jam  : total Rp {s['biaya_sum']:,}, rata-rata Rp {s['biaya_mean']:,.0f} "
+          f"(min {s['biaya_min']}, maks {s['biaya_max']})")
+    print(f"Energi     : {s['energi_kwh']:.2f} kWh (Rp {s['biaya_energi']:,.0f})")
+    print("Waktu ON   : " + ", ".join(f"{t.upper()} {jam:.1f} jam" for t, jam in s["on_jam"].items()))
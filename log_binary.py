@@ -0,0 +1,302 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from log_store import LOG_FILE, PAGE_ROWS, labelled_log_frame
+from smart_data import CUACA_LIST
+
+# ------------------- LOG BINER FIXED-WIDTH -------------------
+BINARY_FILE = "log_energi.bin"
+MAGIC = b"SELOG\x00\x00\x01"
+HEADER = np.dtype([("magic", "S8"), ("record_size", "<u4"), ("reserved", "<u4")])
+READ_CHUNK_ROWS = 100_000
+
+# 24 byte per baris (CSV ~70 byte). waktu dalam detik epoch; flag dikemas per bit.
+RECORD_DTYPE = np.dtype([
+    ("waktu", "<i8"),
+    ("suhu", "<f4"),
+    ("cahaya", "<f4"),
+    ("daya", "<f4"),
+    ("biaya", "<u2"),
+    ("flags", "u1"),
+    ("cuaca", "u1"),
+])
+FLAG_BITS = {"penghuni": 0, "hari_libur": 1, "ac": 2, "tv": 3, "lampu": 4}
+FLAG_LABELS = {
+    "penghuni": ("Penghuni", "Ya"),
+    "hari_libur": ("Hari Libur", "Ya"),
+    "ac": ("AC", "ON"),
+    "tv": ("TV", "ON"),
+    "lampu": ("Lampu", "ON"),
+}
+
+
+def encode_records(df_log):
+    # Frame berlabel (LOG_COLUMNS) -> array RECORD_DTYPE.
+    rec = np.zeros(len(df_log), dtype=RECORD_DTYPE)
+    rec["waktu"] = pd.to_datetime(df_log["Waktu"]).to_numpy("datetime64[s]").astype(np.int64)
+    rec["suhu"] = df_log["Suhu (°C)"]
+    rec["cahaya"] = df_log["Cahaya (%)"]
+    rec["daya"] = df_log["Daya Total (W)"]
+    biaya = df_log["Biaya/Jam (Rp)"].to_numpy()
+    if len(biaya) and (biaya.min() < 0 or biaya.max() > np.iinfo(np.uint16).max):
+        raise ValueError("Biaya/Jam (Rp) di luar rentang uint16")
+    rec["biaya"] = biaya
+    flags = np.zeros(len(df_log), dtype=np.uint8)
+    for name, bit in FLAG_BITS.items():
+        column, on = FLAG_LABELS[name]
+        flags |= (df_log[column].to_numpy() == on).astype(np.uint8) << bit
+    rec["flags"] = flags
+    codes = pd.Categorical(df_log["Cuaca"], categories=CUACA_LIST).codes
+    if (codes < 0).any():
+        raise ValueError("Cuaca tidak dikenal")
+    rec["cuaca"] = codes
+    return rec
+
+
+def _shortest(values):
+    # float32 -> float64 dengan representasi desimal terpendek yang sama (24.2, bukan
+    # 24.200000762): per baris, jumlah desimal terkecil yang kembali ke float32 yang sama.
+    # Hanya untuk |x| < 1e7; di atas itu desimal terpendek belum tentu digit terpendek.
+    x = values.astype(np.float64)
+    out = x.copy()
+    small = np.abs(x) < 1e7
+    todo = small.copy()
+    for decimals in range(10):
+        if not todo.any():
+            break
+        cand = np.round(x[todo], decimals)
+        ok = cand.astype(np.float32) == values[todo]
+        idx = np.flatnonzero(todo)[ok]
+        out[idx] = cand[ok]
+        todo[idx] = False
+    # Sisa (nilai sangat kecil/besar, NaN): lewat repr float32 numpy, lebih lambat tapi umum.
+    rest = ~small | todo
+    if rest.any():
+        out[rest] = values[rest].astype(str).astype(np.float64)
+    return out
+
+
+def _int_if_integral(values):
+    # Nilai bulat kembali sebagai int ("60", bukan "60.0"), seperti yang ditulis dashboard.
+    f = _shortest(values)
+    if (f == np.floor(f)).all():
+        return f.astype(np.int64)
+    return np.array([int(v) if v.is_integer() else v for v in f.tolist()], dtype=object)
+
+
+def _flag(name):
+    return lambda rec: (rec["flags"] >> FLAG_BITS[name]) & 1 == 1
+
+
+# Kolom typed_log_frame -> cara membacanya dari record; hanya kolom yang diminta yang di-decode.
+DECODERS = {
+    "waktu": lambda rec: rec["waktu"].astype("datetime64[s]"),
+    "suhu": lambda rec: _shortest(rec["suhu"]),
+    "cahaya": lambda rec: _int_if_integral(rec["cahaya"]),
+    "penghuni": _flag("penghuni"),
+    "cuaca": lambda rec: pd.Categorical.from_codes(rec["cuaca"].astype(np.int8), categories=CUACA_LIST),
+    "hari_libur": _flag("hari_libur"),
+    "ac": _flag("ac"),
+    "tv": _flag("tv"),
+    "lampu": _flag("lampu"),
+    "daya": lambda rec: _int_if_integral(rec["daya"]),
+    "biaya": lambda rec: rec["biaya"].astype(np.int64),
+}
+
+
+def decode_records(rec, columns=None):
+    # Array RECORD_DTYPE -> frame bertipe (kolom typed_log_frame) tanpa kehilangan nilai CSV.
+    return pd.DataFrame({c: DECODERS[c](rec) for c in columns or DECODERS})
+
+
+def _epoch(ts):
+    return pd.Timestamp(ts).value // 1_000_000_000
+
+
+class BinaryLogStore:
+    # Header 16 byte lalu record RECORD_DTYPE berurutan waktu. Baca lewat numpy.memmap:
+    # query rentang = dua binary search (searchsorted) di kolom waktu + slice tanpa salinan.
+    # Jika ada baris yang masuk tidak urut (mis. jam mundur), query jatuh ke scan mask.
+    def __init__(self, path=BINARY_FILE):
+        self.path = path
+        self.unsorted = False
+        self._file = None
+        self._mmap = None
+        self._lock = threading.Lock()
+        self._last_waktu = None
+        rec = self.records()
+        if len(rec):
+            self.unsorted = bool((np.diff(rec["waktu"]) < 0).any())
+            self._last_waktu = int(rec["waktu"][-1])
+
+    def _open(self):
+        if self._file is not None:
+            return
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size >= HEADER.itemsize:
+            # Record terakhir yang terpotong (crash saat menulis) dibuang.
+            keep = HEADER.itemsize + (size - HEADER.itemsize) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            if keep != size:
+                os.truncate(self.path, keep)
+        self._file = open(self.path, "ab")
+        if size < HEADER.itemsize:
+            self._file.truncate(0)
+            self._file.write(np.array([(MAGIC, RECORD_DTYPE.itemsize, 0)], dtype=HEADER).tobytes())
+
+    def append(self, records):
+        rec = encode_records(pd.DataFrame(records))
+        if not len(rec):
+            return 0
+        with self._lock:
+            self._open()
+            self._file.write(rec.tobytes())
+            self._file.flush()
+            first = int(rec["waktu"][0])
+            if (self._last_waktu is not None and first < self._last_waktu) or (np.diff(rec["waktu"]) < 0).any():
+                self.unsorted = True
+            self._last_waktu = int(rec["waktu"][-1])
+        return len(rec)
+
+    def records(self):
+        # Seluruh file sebagai memmap read-only; dipetakan ulang hanya jika file bertambah.
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        n = max(0, size - HEADER.itemsize) // RECORD_DTYPE.itemsize
+        if n == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        if self._mmap is None or len(self._mmap) != n:
+            header = np.fromfile(self.path, dtype=HEADER, count=1)[0]
+            if header["magic"] != MAGIC or header["record_size"] != RECORD_DTYPE.itemsize:
+                raise ValueError(f"{self.path} bukan log biner format ini")
+            self._mmap = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.itemsize, shape=(n,))
+        return self._mmap
+
+    def rows(self, start=None, end=None):
+        # Record dengan start <= waktu < end; view memmap (tanpa salinan) jika file urut.
+        rec = self.records()
+        lo = None if start is None else _epoch(start)
+        hi = None if end is None else _epoch(end)
+        if self.unsorted:
+            mask = np.ones(len(rec), dtype=bool)
+            if lo is not None:
+                mask &= rec["waktu"] >= lo
+            if hi is not None:
+                mask &= rec["waktu"] < hi
+            return rec[mask]
+        waktu = rec["waktu"]
+        i0 = 0 if lo is None else int(np.searchsorted(waktu, lo, "left"))
+        i1 = len(rec) if hi is None else int(np.searchsorted(waktu, hi, "left"))
+        return rec[i0:i1]
+
+    def last(self, hours):
+        # "N jam terakhir" dihitung dari record terbaru.
+        rec = self.records()
+        if not len(rec):
+            return rec
+        newest = pd.Timestamp(int(rec["waktu"].max() if self.unsorted else rec["waktu"][-1]), unit="s")
+        return self.rows(newest - pd.Timedelta(hours=hours) + pd.Timedelta(seconds=1))
+
+    def read_range(self, start=None, end=None, columns=None):
+        return decode_records(self.rows(start, end), columns)
+
+    def iter_chunks(self, start=None, end=None, columns=None, batch_rows=READ_CHUNK_ROWS):
+        rec = self.rows(start, end)
+        for i in range(0, len(rec), batch_rows):
+            yield decode_records(rec[i:i + batch_rows], columns)
+
+    def count(self, start=None, end=None):
+        return len(self.rows(start, end))
+
+    def page(self, start=None, end=None, devices=None, offset=0, limit=PAGE_ROWS):
+        # Halaman terbaru dulu: slice dari ujung memmap; filter perangkat cukup membaca byte flags.
+        rec = self.rows(start, end)
+        if self.unsorted:
+            rec = rec[np.argsort(rec["waktu"], kind="stable")]
+        if devices:
+            mask = np.ones(len(rec), dtype=bool)
+            for name, on in devices.items():
+                mask &= ((rec["flags"] >> FLAG_BITS[name]) & 1 == 1) == on
+            idx = np.flatnonzero(mask)
+            total = len(idx)
+            rec = rec[idx[::-1][offset:offset + limit]]
+        else:
+            total = len(rec)
+            hi = max(total - offset, 0)
+            rec = rec[max(hi - limit, 0):hi][::-1]
+        return decode_records(rec), total
+
+    def summary(self, start=None, end=None):
+        biaya = self.rows(start, end)["biaya"]
+        return {
+            "count": len(biaya),
+            "biaya_total": int(biaya.sum(dtype=np.int64)),
+            "biaya_mean": float(biaya.mean()) if len(biaya) else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def reset(self):
+        self.close()
+        with self._lock:
+            self._mmap = None
+            self._last_waktu = None
+            self.unsorted = False
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+# ------------------- KONVERSI CSV <-> BINER -------------------
+def csv_to_binary(csv_path, bin_path, chunk_rows=READ_CHUNK_ROWS):
+    store = BinaryLogStore(bin_path)
+    store.reset()
+    rows = sum(store.append(chunk) for chunk in pd.read_csv(csv_path, chunksize=chunk_rows))
+    store.close()
+    return rows
+
+
+def binary_to_csv(bin_path, csv_path, chunk_rows=READ_CHUNK_ROWS):
+    store = BinaryLogStore(bin_path)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        header = True
+        for chunk in store.iter_chunks(batch_rows=chunk_rows):
+            labelled_log_frame(chunk).to_csv(f, index=False, header=header, lineterminator="\n")
+            header = False
+        if header:
+            labelled_log_frame(decode_records(store.records())).to_csv(f, index=False, lineterminator="\n")
+    return store.count()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi log CSV <-> biner fixed-width")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("to-bin")
+    p.add_argument("csv", nargs="?", default=LOG_FILE)
+    p.add_argument("--out", default=BINARY_FILE)
+    p = sub.add_parser("to-csv")
+    p.add_argument("bin", nargs="?", default=BINARY_FILE)
+    p.add_argument("--out", default="log_energi_dari_biner.csv")
+    p = sub.add_parser("tail", help="N jam terakhir")
+    p.add_argument("bin", nargs="?", default=BINARY_FILE)
+    p.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "to-bin":
+        rows = csv_to_binary(args.csv, args.out)
+        print(f"{rows:,} baris -> {args.out} ({os.path.getsize(args.out) / 1e6:.2f} MB, "
+              f"{os.path.getsize(args.csv) / 1e6:.2f} MB CSV) dalam {time.perf_counter() - start:.2f} s")
+    elif args.command == "to-csv":
+        rows = binary_to_csv(args.bin, args.out)
+        print(f"{rows:,} baris -> {args.out} dalam {time.perf_counter() - start:.2f} s")
+    else:
+        rec = BinaryLogStore(args.bin).last(args.hours)
+        print(labelled_log_frame(decode_records(rec)).to_string(index=False))
+        print(f"{len(rec):,} baris dalam {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,87 @@
+import argparse
+import gzip
+import io
+import os
+import tempfile
+import time
+
+from log_store import LOG_BACKEND, LOG_COLUMNS, READ_CHUNK_ROWS, labelled_log_frame, open_log_store, typed_log_frame
+
+# ------------------- EXPORT LOG STREAMING -------------------
+# format -> (mime, ekstensi file)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+# Hasil export sampai ukuran ini disimpan di memori; lebih besar dari itu pindah ke file sementara.
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def _write_csv(chunks, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    # Header ditulis sekali, juga saat rentangnya kosong.
+    text.write(",".join(LOG_COLUMNS) + "\n")
+    rows = 0
+    for chunk in chunks:
+        labelled_log_frame(chunk).to_csv(text, index=False, header=False, lineterminator="\n")
+        rows += len(chunk)
+    text.flush()
+    text.detach()
+    return rows
+
+
+def _write_parquet(chunks, out):
+    # Satu row group per chunk; tipe kolom disamakan ke LOG_SCHEMA apa pun backend asalnya.
+    # Import di sini agar export CSV (dan dashboard dengan backend CSV) tidak memuat pyarrow.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from log_parquet import LOG_SCHEMA
+
+    rows = 0
+    with pq.ParquetWriter(out, LOG_SCHEMA) as writer:
+        for chunk in chunks:
+            df = typed_log_frame(labelled_log_frame(chunk))
+            writer.write_table(pa.Table.from_pandas(df, schema=LOG_SCHEMA, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def export_log(store, out, fmt="csv", start=None, end=None, batch_rows=READ_CHUNK_ROWS):
+    # Baris start <= waktu < end dari store ditulis ke file biner `out` chunk demi chunk,
+    # jadi riwayat lengkap tidak pernah dimuat ke memori. Mengembalikan jumlah baris.
+    chunks = store.iter_chunks(start, end, batch_rows=batch_rows)
+    if fmt == "csv":
+        return _write_csv(chunks, out)
+    if fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=out, mode="wb") as gz:
+            return _write_csv(chunks, gz)
+    if fmt == "parquet":
+        return _write_parquet(chunks, out)
+    raise ValueError(f"Format export tidak dikenal: {fmt}")
+
+
+def export_bytes(store, fmt="csv", start=None, end=None):
+    # Hasil export sebagai bytes untuk st.download_button (Streamlit tidak menerima file
+    # sementara). Selama export, chunk ditampung di file sementara, bukan di list frame.
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as out:
+        export_log(store, out, fmt, start, end)
+        out.seek(0)
+        return out.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export log energi per rentang waktu")
+    parser.add_argument("--backend", default=LOG_BACKEND, choices=["csv", "sqlite", "binary", "parquet"])
+    parser.add_argument("--format", default="csv", choices=list(EXPORT_FORMATS))
+    parser.add_argument("--start", help="mis. 2025-07-01")
+    parser.add_argument("--end", help="eksklusif, mis. 2025-08-01")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    out_path = args.out or f"log_energi_export{EXPORT_FORMATS[args.format][1]}"
+    start = time.perf_counter()
+    with open(out_path, "wb") as f:
+        rows = export_log(open_log_store(args.backend), f, args.format, args.start, args.end)
+    print(f"{rows:,} baris -> {out_path} ({os.path.getsize(out_path) / 1e6:.2f} MB) "
+          f"dalam {time.perf_counter() - start:.2f} s")
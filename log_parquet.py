@@ -0,0 +1,280 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from log_store import LOG_FILE, PAGE_ROWS, labelled_log_frame, typed_log_frame
+from smart_data import CUACA_LIST
+
+# ------------------- LOG PARQUET PER TANGGAL -------------------
+# pyarrow hanya dimuat saat backend atau export Parquet dipakai (lihat open_log_store).
+PARQUET_DIR = "log_energi_parquet"
+CSV_CHUNK_ROWS = 100_000
+# Tanggal yang masih berjalan digabung begitu jumlah part-nya mencapai ini.
+COMPACT_PARTS = 64
+
+# Kolom bertipe dari typed_log_frame; cuaca di-dictionary-encode, flag jadi bool.
+LOG_SCHEMA = pa.schema([
+    ("waktu", pa.timestamp("s")),
+    ("suhu", pa.float64()),
+    ("cahaya", pa.int16()),
+    ("penghuni", pa.bool_()),
+    ("cuaca", pa.dictionary(pa.int8(), pa.string())),
+    ("hari_libur", pa.bool_()),
+    ("ac", pa.bool_()),
+    ("tv", pa.bool_()),
+    ("lampu", pa.bool_()),
+    ("daya", pa.float64()),
+    ("biaya", pa.int32()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("tanggal", pa.string())]), flavor="hive")
+
+
+class ParquetLogStore:
+    # Satu direktori per tanggal (tanggal=YYYY-MM-DD/part-*.parquet). Filter rentang
+    # waktu memangkas partisi dari nama direktori, lalu row group dari statistik `waktu`.
+    # Setiap append menulis file part baru. Begitu baris dari tanggal baru masuk, tanggal
+    # sebelumnya digabung jadi satu file (seperti rotasi log CSV), dan tanggal berjalan
+    # digabung setiap COMPACT_PARTS part, sehingga jumlah file tetap kecil.
+    # Pembaca mengambil daftar file di bawah lock lalu scan tanpa lock; part yang sudah
+    # digabung tapi masih dibaca baru dihapus setelah pembaca terakhirnya selesai.
+    def __init__(self, root=PARQUET_DIR, compact_parts=COMPACT_PARTS):
+        self.root = root
+        self.compact_parts = compact_parts
+        self._lock = threading.RLock()
+        self._active = None
+        self._readers = Counter()
+        self._retired = set()
+        self._recover()
+
+    def append(self, records):
+        # `records`: list dict atau DataFrame dengan kolom LOG_COLUMNS.
+        df = typed_log_frame(pd.DataFrame(records))
+        if df.empty:
+            return 0
+        tanggal = df["waktu"].dt.strftime("%Y-%m-%d")
+        with self._lock:
+            if self._active is None:
+                # Tanggal terbaru di disk; tanggal yang lebih lama sudah tertutup.
+                self._active = (self.partitions() or [None])[-1]
+            for day, part in df.groupby(tanggal, sort=True):
+                self._write_part(day, part)
+                if self._active is None or day > self._active:
+                    if self._active is not None:
+                        self.compact(day_before=day)
+                    self._active = day
+                elif day < self._active:
+                    # Baris terlambat untuk tanggal yang sudah tertutup.
+                    self._compact_day(day)
+            if self.compact_parts and len(self._parts(self._active)) >= self.compact_parts:
+                self._compact_day(self._active)
+        return len(df)
+
+    def _parts(self, day="*"):
+        # Part yang berlaku; part yang sudah digabung (menunggu dihapus) tidak ikut.
+        parts = glob.glob(os.path.join(self.root, f"tanggal={day}", "part-*.parquet"))
+        return sorted(p for p in parts if p not in self._retired)
+
+    def _recover(self):
+        # Crash antara menulis file gabungan dan menghapus part lamanya: part yang tercatat
+        # di metadata file gabungan dihapus sekarang, supaya barisnya tidak terbaca dua kali.
+        for path in glob.glob(os.path.join(self.root, "tanggal=*", "part-*-compact.parquet")):
+            metadata = pq.read_schema(path).metadata or {}
+            for name in json.loads(metadata.get(b"replaces", b"[]")):
+                old = os.path.join(os.path.dirname(path), name)
+                if os.path.exists(old):
+                    os.remove(old)
+
+    def _write_part(self, day, df):
+        path = os.path.join(self.root, f"tanggal={day}")
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pandas(df, schema=LOG_SCHEMA, preserve_index=False)
+        # Tulis ke nama sementara lalu rename, supaya pembaca tidak melihat file setengah jadi.
+        tmp = os.path.join(path, f".part-{uuid.uuid4().hex}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(path, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"))
+
+    def partitions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d.split("=", 1)[1] for d in os.listdir(self.root) if d.startswith("tanggal="))
+
+    @contextmanager
+    def _snapshot(self):
+        # Dataset dari daftar part saat ini. Selama dipakai, part-nya tidak dihapus
+        # oleh penggabungan, dan append tidak perlu menunggu scan selesai.
+        with self._lock:
+            files = self._parts()
+            self._readers.update(files)
+        try:
+            yield ds.dataset(files, format="parquet", partitioning=PARTITIONING,
+                             partition_base_dir=self.root, schema=_dataset_schema())
+        finally:
+            with self._lock:
+                self._readers.subtract(files)
+                self._readers = +self._readers  # buang hitungan nol
+                self._delete_retired()
+
+    def _delete_retired(self):
+        for path in [p for p in self._retired if self._readers[p] <= 0]:
+            if os.path.exists(path):
+                os.remove(path)
+            self._retired.discard(path)
+            del self._readers[path]
+
+    def _filter(self, start, end):
+        expr = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            expr = (ds.field("tanggal") >= start.strftime("%Y-%m-%d")) & (ds.field("waktu") >= start.to_pydatetime())
+        if end is not None:
+            end = pd.Timestamp(end)
+            e = (ds.field("tanggal") <= end.strftime("%Y-%m-%d")) & (ds.field("waktu") < end.to_pydatetime())
+            expr = e if expr is None else expr & e
+        return expr
+
+    def read_range(self, start=None, end=None, columns=None):
+        # Baris dengan start <= waktu < end sebagai frame bertipe, urut waktu.
+        if not self.partitions():
+            return _empty_frame(columns)
+        with self._snapshot() as dataset:
+            table = dataset.to_table(columns=columns or LOG_SCHEMA.names, filter=self._filter(start, end))
+        if "waktu" in table.column_names:
+            table = table.sort_by("waktu")
+        return _to_frame(table)
+
+    def iter_chunks(self, start=None, end=None, columns=None, batch_rows=CSV_CHUNK_ROWS):
+        # Streaming per record batch; memori tidak mengikuti panjang rentang.
+        if not self.partitions():
+            return
+        with self._snapshot() as dataset:
+            scanner = dataset.scanner(
+                columns=columns or LOG_SCHEMA.names, filter=self._filter(start, end), batch_size=batch_rows
+            )
+            for batch in scanner.to_batches():
+                if batch.num_rows:
+                    yield _to_frame(pa.Table.from_batches([batch]))
+
+    def count(self, start=None, end=None):
+        if not self.partitions():
+            return 0
+        with self._snapshot() as dataset:
+            return dataset.count_rows(filter=self._filter(start, end))
+
+    def page(self, start=None, end=None, devices=None, offset=0, limit=PAGE_ROWS):
+        # Jumlah baris cocok per tanggal dihitung dulu (hanya kolom filter yang dibaca), lalu
+        # hanya partisi yang memuat halaman ini yang dibaca penuh, terbaru dulu.
+        if not self.partitions():
+            return _empty_frame(), 0
+        with self._snapshot() as dataset:
+            return self._page(dataset, start, end, devices, offset, limit)
+
+    def _page(self, dataset, start, end, devices, offset, limit):
+        expr = self._filter(start, end)
+        for name, on in (devices or {}).items():
+            e = ds.field(name) == on
+            expr = e if expr is None else expr & e
+        counts = dataset.to_table(columns=["tanggal"], filter=expr).column("tanggal").value_counts()
+        per_day = sorted(zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()), reverse=True)
+        total = sum(n for _, n in per_day)
+
+        days, seen, skip = [], 0, 0
+        for day, n in per_day:
+            if seen + n <= offset:
+                seen += n
+                continue
+            if not days:
+                skip = offset - seen
+            days.append(day)
+            seen += n
+            if seen >= offset + limit:
+                break
+        if not days:
+            return _empty_frame(), total
+        day_expr = ds.field("tanggal").isin(days)
+        table = dataset.to_table(columns=LOG_SCHEMA.names, filter=day_expr if expr is None else expr & day_expr)
+        table = table.sort_by([("waktu", "descending")]).slice(skip, limit)
+        return _to_frame(table), total
+
+    def summary(self, start=None, end=None):
+        # Hanya kolom biaya yang dibaca.
+        biaya = self.read_range(start, end, columns=["biaya"])["biaya"]
+        return {"count": len(biaya), "biaya_total": int(biaya.sum()), "biaya_mean": float(biaya.mean()) if len(biaya) else 0.0}
+
+    def reset(self):
+        with self._lock:
+            if os.path.isdir(self.root):
+                shutil.rmtree(self.root)
+            self._active = None
+            self._retired.clear()
+
+    def compact(self, day_before=None):
+        # Gabungkan semua part dalam satu tanggal menjadi satu file terurut waktu; dengan
+        # `day_before` hanya tanggal sebelum tanggal itu.
+        with self._lock:
+            return sum(self._compact_day(day) for day in self.partitions() if day_before is None or day < day_before)
+
+    def _compact_day(self, day):
+        parts = self._parts(day)
+        if len(parts) < 2:
+            return 0
+        path = os.path.join(self.root, f"tanggal={day}")
+        table = pq.read_table(parts, schema=LOG_SCHEMA).sort_by("waktu")
+        # Nama part yang digantikan disimpan di metadata, untuk _recover setelah crash.
+        replaces = json.dumps([os.path.basename(p) for p in parts]).encode()
+        tmp = os.path.join(path, ".compact.tmp")
+        pq.write_table(table.replace_schema_metadata({b"replaces": replaces}), tmp)
+        os.replace(tmp, os.path.join(path, f"part-{time.time_ns()}-compact.parquet"))
+        self._retired.update(parts)
+        self._delete_retired()
+        return len(parts)
+
+    def import_csv(self, csv_path=LOG_FILE, chunk_rows=CSV_CHUNK_ROWS):
+        # Konversi log CSV per chunk (memori terbatas), lalu satu file per tanggal.
+        rows = sum(self.append(chunk) for chunk in pd.read_csv(csv_path, chunksize=chunk_rows))
+        self.compact()
+        return rows
+
+    def size_bytes(self):
+        return sum(os.path.getsize(p) for p in glob.glob(os.path.join(self.root, "*", "*.parquet")))
+
+
+def _dataset_schema():
+    return LOG_SCHEMA.append(pa.field("tanggal", pa.string()))
+
+
+def _to_frame(table):
+    df = table.drop_columns([c for c in ("tanggal",) if c in table.column_names]).to_pandas()
+    if "cuaca" in df:
+        df["cuaca"] = df["cuaca"].cat.set_categories(CUACA_LIST)
+    return df
+
+
+def _empty_frame(columns=None):
+    return _to_frame(LOG_SCHEMA.empty_table()).loc[:, columns or LOG_SCHEMA.names]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi log CSV ke Parquet terpartisi per tanggal")
+    parser.add_argument("csv", nargs="?", default=LOG_FILE)
+    parser.add_argument("--out", default=PARQUET_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    store = ParquetLogStore(args.out)
+    start = time.perf_counter()
+    rows = store.import_csv(args.csv, args.chunk_rows)
+    print(f"{rows:,} baris -> {args.out} ({len(store.partitions())} tanggal, "
+          f"{store.size_bytes() / 1e6:.2f} MB) dalam {time.perf_counter() - start:.2f} s")
+    print(labelled_log_frame(store.read_range()).tail().to_string(index=False))
@@ -0,0 +1,191 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from smart_data import FEATURES, TARGETS, CUACA_LIST, DAYA_PERANGKAT, DAYA_LAIN, TARIF_PER_KWH
+from smart_model import load_or_train_models
+from smart_rules import RulesEngine, ShadowAuditor
+from fast_forest import as_features
+from lookup_table import SUHU_BINS, CAHAYA_BINS, load_or_build
+from prediction_cache import DEFAULT_MAXSIZE, PredictionCache
+from log_store import LOG_BACKEND, READ_CHUNK_ROWS, CsvLogWriter, iter_csv_chunks, open_log_store
+from log_writer import BackgroundLogWriter
+import model_store
+
+# ------------------- REPLAY LOG -------------------
+# Bacaan sensor dari log yang sudah ada diputar ulang lewat pipeline dashboard
+# (prediksi -> daya & biaya -> logging), satu baris per langkah seperti rerun.
+# speedup 1 = tempo asli (40 s per baris), 0 = secepat mungkin.
+REPLAY_FILE = "log_energi_replay.csv"
+STAGES = ["baca", "prediksi", "biaya", "log"]
+
+
+def build_predictor(mode="compiled", cache_size=DEFAULT_MAXSIZE, shadow_rate=0.1):
+    # Predictor yang sama dengan dashboard untuk SMART_ENERGY_PREDICT_MODE / CACHE_SIZE.
+    artifact, info = load_or_train_models()
+    if mode == "lookup":
+        path = os.path.join(model_store.artifact_dir(info["key"]), f"lookup_{SUHU_BINS}x{CAHAYA_BINS}.npz")
+        predictor = load_or_build(artifact["models"], path)
+    elif mode == "rules":
+        predictor = ShadowAuditor(RulesEngine(FEATURES, {"cuaca": CUACA_LIST}), artifact["compiled"], TARGETS,
+                                  shadow_rate)
+    else:
+        predictor = artifact["compiled"]
+    return PredictionCache(predictor, maxsize=cache_size) if cache_size > 0 else predictor
+
+
+def _readings(chunk):
+    # Frame bertipe (iter_chunks) -> (waktu, bacaan urutan FEATURES, status tercatat) per baris.
+    jam = chunk["waktu"].dt.hour.to_numpy()
+    readings = zip(
+        chunk["suhu"].tolist(), jam.tolist(), chunk["penghuni"].astype(int).tolist(),
+        chunk["cuaca"].astype(str).tolist(), chunk["hari_libur"].astype(int).tolist(), chunk["cahaya"].tolist(),
+    )
+    recorded = chunk[TARGETS].to_numpy().astype(np.int8)
+    return zip(chunk["waktu"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist(), readings, recorded)
+
+
+class LogReplay:
+    # `sink`: apa pun yang punya append(records) (log store atau BackgroundLogWriter).
+    # Waktu tiap tahap diukur terpisah; jeda untuk menjaga tempo tidak ikut dihitung.
+    def __init__(self, predictor, sink, speedup=0.0):
+        self.predictor = predictor
+        self.sink = sink
+        self.speedup = speedup
+        self.stage_s = dict.fromkeys(STAGES, 0.0)
+        self.rows = 0
+        self.agree = np.zeros(len(TARGETS), dtype=np.int64)
+        self.biaya_total = 0
+        self.max_lag_s = 0.0
+        self.wall_s = 0.0
+
+    def run(self, chunks, limit=None):
+        started = time.perf_counter()
+        t0 = anchor = None
+        chunks = iter(chunks)
+        while limit is None or self.rows < limit:
+            t = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            rows = list(_readings(chunk))
+            self.stage_s["baca"] += time.perf_counter() - t
+
+            for waktu, reading, recorded in rows:
+                if limit is not None and self.rows >= limit:
+                    break
+                if self.speedup > 0:
+                    # Jadwal dihitung dari baris pertama: baris ke-i jatuh pada (waktu_i - waktu_0) / speedup.
+                    ts = pd.Timestamp(waktu).timestamp()
+                    if t0 is None:
+                        t0, anchor = ts, time.perf_counter()
+                    delay = anchor + (ts - t0) / self.speedup - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        self.max_lag_s = max(self.max_lag_s, -delay)
+                self._step(waktu, reading, recorded)
+        self.wall_s = time.perf_counter() - started
+        return self.report()
+
+    def _step(self, waktu, reading, recorded):
+        t = time.perf_counter()
+        states = self.predictor.predict(as_features(reading))[0]
+        t_pred = time.perf_counter()
+
+        status = ["ON" if s else "OFF" for s in states]
+        daya_total = sum(DAYA_PERANGKAT[d] for d, s in zip(TARGETS, states) if s) + DAYA_LAIN
+        biaya = (daya_total / 1000) * TARIF_PER_KWH
+        t_biaya = time.perf_counter()
+
+        suhu, _, penghuni_ada, cuaca, hari_libur, cahaya = reading
+        self.sink.append([{
+            "Waktu": waktu,
+            "Suhu (°C)": suhu,
+            "Cahaya (%)": cahaya,
+            "Penghuni": "Ya" if penghuni_ada else "Tidak",
+            "Cuaca": cuaca,
+            "Hari Libur": "Ya" if hari_libur else "Tidak",
+            "AC": status[0],
+            "TV": status[1],
+            "Lampu": status[2],
+            "Daya Total (W)": round(daya_total, 1),
+            "Biaya/Jam (Rp)": int(biaya),
+        }])
+        t_log = time.perf_counter()
+
+        self.stage_s["prediksi"] += t_pred - t
+        self.stage_s["biaya"] += t_biaya - t_pred
+        self.stage_s["log"] += t_log - t_biaya
+        self.rows += 1
+        self.agree += np.asarray(states) == recorded
+        self.biaya_total += int(biaya)
+
+    def report(self):
+        return {
+            "rows": self.rows,
+            "wall_s": self.wall_s,
+            "rows_per_s": self.rows / self.wall_s if self.wall_s else 0.0,
+            # None bila tidak ada baris (rentang kosong, --limit 0) atau waktunya tidak terukur.
+            "stage_rows_per_s": {s: self.rows / sec if self.rows and sec else None for s, sec in self.stage_s.items()},
+            "stage_s": dict(self.stage_s),
+            "max_lag_s": self.max_lag_s,
+            "agree": {t: a / self.rows if self.rows else 0.0 for t, a in zip(TARGETS, self.agree)},
+            "biaya_total": self.biaya_total,
+        }
+
+
+def _round(value):
+    return None if value is None else round(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Putar ulang log energi lewat pipeline prediksi/biaya/logging")
+    parser.add_argument("--source", default=None, help="file CSV log; default: log store SMART_ENERGY_LOG_BACKEND")
+    parser.add_argument("--backend", default=LOG_BACKEND, choices=["csv", "sqlite", "binary", "parquet"])
+    parser.add_argument("--start", help="mis. 2025-07-01")
+    parser.add_argument("--end", help="eksklusif, mis. 2025-08-01")
+    parser.add_argument("--limit", type=int, default=None, help="jumlah baris maksimum")
+    parser.add_argument("--speedup", type=float, default=0.0, help="kelipatan tempo asli; 0 = secepat mungkin")
+    parser.add_argument("--mode", default=os.environ.get("SMART_ENERGY_PREDICT_MODE", "compiled"),
+                        choices=["compiled", "lookup", "rules"])
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAXSIZE)
+    parser.add_argument("--out", default=REPLAY_FILE, help="file CSV hasil replay")
+    parser.add_argument("--background", action="store_true", help="tulis lewat BackgroundLogWriter")
+    args = parser.parse_args()
+
+    if args.source:
+        chunks = iter_csv_chunks([args.source], args.start, args.end, None, READ_CHUNK_ROWS)
+    else:
+        chunks = open_log_store(args.backend).iter_chunks(args.start, args.end)
+    if os.path.exists(args.out):
+        os.remove(args.out)
+    store = CsvLogWriter(args.out)
+    sink = BackgroundLogWriter(store) if args.background else store
+
+    replay = LogReplay(build_predictor(args.mode, args.cache_size), sink, args.speedup)
+    report = replay.run(chunks, args.limit)
+    start = time.perf_counter()
+    if args.background:
+        sink.close()
+    store.close()
+    drain_s = time.perf_counter() - start
+
+    print(f"{report['rows']:,} baris dalam {report['wall_s']:.2f} s ({report['rows_per_s']:,.0f} baris/s), "
+          f"mode {args.mode}, speedup {args.speedup:g}" + (" (secepat mungkin)" if not args.speedup else ""))
+    print(pd.DataFrame({
+        "tahap": STAGES,
+        "total (s)": [round(report["stage_s"][s], 3) for s in STAGES],
+        "baris/s": [_round(report["stage_rows_per_s"][s]) for s in STAGES],
+        "us/baris": [round(report["stage_s"][s] / max(report["rows"], 1) * 1e6, 1) for s in STAGES],
+    }).to_string(index=False))
+    if args.speedup:
+        print(f"Tertinggal dari jadwal maks {report['max_lag_s'] * 1000:.1f} ms")
+    if args.background:
+        print(f"Sisa antrean writer ditulis dalam {drain_s * 1000:.0f} ms")
+    print("Sama dengan status tercatat: "
+          + ", ".join(f"{t.upper()} {a * 100:.1f}%" for t, a in report["agree"].items()))
+    print(f"Total Biaya/Jam replay: Rp {report['biaya_total']:,} -> {args.out}")
@@ -0,0 +1,166 @@
+import gzip
+import itertools
+import json
+import os
+import threading
+
+import pandas as pd
+
+from log_store import LOG_FILE, PAGE_ROWS, READ_CHUNK_ROWS, CsvLogWriter, iter_csv_chunks, page_from_chunks, typed_log_frame
+
+# ------------------- ROTASI LOG -------------------
+# SMART_ENERGY_LOG_ROTATE: "D" (segmen harian), "h" (per jam) atau "none" (satu file).
+ROTATE_PERIOD = os.environ.get("SMART_ENERGY_LOG_ROTATE", "D")
+# Segmen yang seluruhnya lebih tua dari ini (dihitung dari baris terbaru) dihapus; 0 = simpan semua.
+RETENTION_DAYS = float(os.environ.get("SMART_ENERGY_LOG_RETENTION_DAYS", "30"))
+SEGMENT_DIR = "log_segments"
+MANIFEST_FILE = "manifest.json"
+
+# Panjang prefix "YYYY-MM-DD HH:MM:SS" yang menentukan periode satu baris.
+PERIOD_KEY_LEN = {"D": 10, "h": 13}
+
+
+class RotatingCsvLogStore:
+    # File aktif tetap LOG_FILE (append-only lewat CsvLogWriter). Begitu baris dari
+    # periode baru masuk, file aktif dikompres ke log_segments/<nama>_<periode>.csv.gz
+    # dan batas waktunya dicatat di manifest.json, sehingga query rentang waktu hanya
+    # membuka segmen yang beririsan.
+    def __init__(self, path=LOG_FILE, segment_dir=SEGMENT_DIR, period=ROTATE_PERIOD,
+                 retention_days=RETENTION_DAYS):
+        self.path = path
+        self.segment_dir = segment_dir
+        self.key_len = PERIOD_KEY_LEN[period]
+        self.retention_days = retention_days
+        self.writer = CsvLogWriter(path)
+        self._lock = threading.Lock()
+        # on_expire(segmen) dipanggil setelah retensi menghapus segmen (mis. LogAggregates).
+        self.on_expire = None
+        self._manifest_path = os.path.join(segment_dir, MANIFEST_FILE)
+        os.makedirs(segment_dir, exist_ok=True)
+        self.segments = self._load_manifest()
+        self._active = self._active_period()
+
+    # --- manifest ---
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return []
+        with open(self._manifest_path) as f:
+            return json.load(f)["segments"]
+
+    def _save_manifest(self):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segments": self.segments}, f, indent=1)
+        os.replace(tmp, self._manifest_path)
+
+    def _active_period(self):
+        # Periode file aktif = periode baris data pertamanya.
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding="utf-8") as f:
+            f.readline()
+            first = f.readline()
+        if not first.endswith("\n"):
+            return None
+        key = first[:self.key_len]
+        if any(s["period"] == key for s in self.segments):
+            # Crash setelah segmen & manifest ditulis tapi sebelum file aktif dihapus.
+            os.remove(self.path)
+            return None
+        return key
+
+    # --- penulisan & rotasi ---
+    def append(self, records):
+        with self._lock:
+            for key, group in itertools.groupby(records, key=lambda r: r["Waktu"][:self.key_len]):
+                group = list(group)
+                if self._active is not None and key > self._active:
+                    self._rotate(newest=group[-1]["Waktu"])
+                if self._active is None:
+                    self._active = key
+                self.writer.append(group)
+
+    def _rotate(self, newest):
+        self.writer.close()
+        name = f"{os.path.splitext(os.path.basename(self.path))[0]}_{self._active.replace(' ', '_')}.csv.gz"
+        segment = dict(self._compress(os.path.join(self.segment_dir, name)), period=self._active)
+        self.segments = [s for s in self.segments if s["file"] != name] + [segment]
+        self._apply_retention(newest)
+        self._save_manifest()
+        os.remove(self.path)
+        self._active = None
+
+    def _compress(self, dst):
+        rows, start, end = 0, None, None
+        tmp = dst + ".tmp"
+        with open(self.path, "rb") as src, gzip.open(tmp, "wb") as out:
+            out.write(src.readline())
+            for line in src:
+                waktu = line[:19].decode()
+                start = waktu if start is None or waktu < start else start
+                end = waktu if end is None or waktu > end else end
+                rows += 1
+                out.write(line)
+        os.replace(tmp, dst)
+        return {"file": os.path.basename(dst), "start": start, "end": end, "rows": rows,
+                "bytes": os.path.getsize(dst)}
+
+    def _apply_retention(self, newest):
+        if not self.retention_days:
+            return
+        cutoff = str(pd.Timestamp(newest) - pd.Timedelta(days=self.retention_days))
+        expired = [s for s in self.segments if s["end"] < cutoff]
+        for s in expired:
+            os.remove(os.path.join(self.segment_dir, s["file"]))
+            self.segments.remove(s)
+        if expired and self.on_expire is not None:
+            self.on_expire(expired)
+
+    def flush(self, fsync=False):
+        self.writer.flush(fsync)
+
+    def close(self):
+        self.writer.close()
+
+    def reset(self):
+        with self._lock:
+            self.writer.reset()
+            for s in self.segments:
+                path = os.path.join(self.segment_dir, s["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+            self.segments = []
+            self._save_manifest()
+            self._active = None
+
+    # --- baca ---
+    def files_for(self, start=None, end=None):
+        # Segmen yang beririsan dengan [start, end) menurut manifest, ditambah file aktif.
+        start = None if start is None else str(pd.Timestamp(start))
+        end = None if end is None else str(pd.Timestamp(end))
+        files = [
+            os.path.join(self.segment_dir, s["file"])
+            for s in sorted(self.segments, key=lambda s: s["start"])
+            if (start is None or s["end"] >= start) and (end is None or s["start"] < end)
+        ]
+        if os.path.exists(self.path):
+            files.append(self.path)
+        return files
+
+    def iter_chunks(self, start=None, end=None, columns=None, batch_rows=READ_CHUNK_ROWS):
+        self.writer.flush()
+        yield from iter_csv_chunks(self.files_for(start, end), start, end, columns, batch_rows)
+
+    def read_range(self, start=None, end=None, columns=None):
+        chunks = list(self.iter_chunks(start, end, columns))
+        if chunks:
+            return pd.concat(chunks, ignore_index=True)
+        empty = typed_log_frame(pd.DataFrame(columns=self.writer.columns))
+        return empty[columns] if columns else empty
+
+    def count(self, start=None, end=None):
+        return sum(len(c) for c in self.iter_chunks(start, end, columns=["waktu"]))
+
+    def page(self, start=None, end=None, devices=None, offset=0, limit=PAGE_ROWS):
+        # Hanya segmen yang beririsan dengan rentang yang dibuka (manifest).
+        return page_from_chunks(self.iter_chunks(start, end), devices, offset, limit)
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from log_store import PAGE_ROWS, typed_log_frame
+from smart_data import CUACA_LIST
+
+# ------------------- LOG SQLITE (WAL) -------------------
+SQLITE_FILE = "log_energi.db"
+READ_CHUNK_ROWS = 10_000
+
+# Kolom bertipe yang sama dengan typed_log_frame; waktu disimpan sebagai detik epoch
+# (INTEGER) sehingga indeks dan perbandingan rentang tidak perlu parsing string.
+COLUMNS = ["waktu", "suhu", "cahaya", "penghuni", "cuaca", "hari_libur", "ac", "tv", "lampu", "daya", "biaya"]
+FLAG_COLUMNS = ["penghuni", "hari_libur", "ac", "tv", "lampu"]
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log (
+    waktu INTEGER NOT NULL,
+    suhu REAL NOT NULL,
+    cahaya INTEGER NOT NULL,
+    penghuni INTEGER NOT NULL,
+    cuaca INTEGER NOT NULL,
+    hari_libur INTEGER NOT NULL,
+    ac INTEGER NOT NULL,
+    tv INTEGER NOT NULL,
+    lampu INTEGER NOT NULL,
+    daya REAL NOT NULL,
+    biaya INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_waktu ON log (waktu);
+"""
+
+
+def _epoch(ts):
+    return pd.Timestamp(ts).value // 1_000_000_000
+
+
+def _where(start, end, devices=None):
+    clauses, params = [], []
+    for name, on in (devices or {}).items():
+        if name not in FLAG_COLUMNS:
+            raise ValueError(f"Kolom filter tidak dikenal: {name}")
+        clauses.append(f"{name} = ?")
+        params.append(int(on))
+    if start is not None:
+        clauses.append("waktu >= ?")
+        params.append(_epoch(start))
+    if end is not None:
+        clauses.append("waktu < ?")
+        params.append(_epoch(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _typed(df):
+    # Baris SQL -> frame bertipe seperti typed_log_frame.
+    df["waktu"] = df["waktu"].astype("datetime64[s]")
+    for c in FLAG_COLUMNS:
+        if c in df:
+            df[c] = df[c].astype(bool)
+    if "cuaca" in df:
+        df["cuaca"] = pd.Categorical.from_codes(df["cuaca"].astype(np.int8), categories=CUACA_LIST)
+    return df
+
+
+class SqliteLogStore:
+    # Mode WAL: pembaca dari sesi lain tidak diblok saat ada penulisan, dan beberapa
+    # penulis diserialkan oleh SQLite (busy timeout). Koneksi dibuat per thread karena
+    # setiap sesi Streamlit berjalan di thread sendiri.
+    def __init__(self, path=SQLITE_FILE, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Dengan WAL, NORMAL tetap konsisten setelah crash; hanya transaksi terakhir yang bisa hilang.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, records):
+        # Semua baris dimasukkan dalam satu transaksi (satu commit, satu sync WAL).
+        df = typed_log_frame(pd.DataFrame(records))
+        if df.empty:
+            return 0
+        values = pd.DataFrame({
+            "waktu": df["waktu"].astype(np.int64),
+            **{c: df[c] for c in ("suhu", "cahaya")},
+            **{c: df[c].astype(np.int8) for c in FLAG_COLUMNS},
+            "cuaca": df["cuaca"].cat.codes,
+            "daya": df["daya"],
+            "biaya": df["biaya"],
+        }, columns=COLUMNS)
+        with self._conn() as conn:
+            conn.executemany(
+                f"INSERT INTO log ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                values.itertuples(index=False, name=None),
+            )
+        return len(values)
+
+    def read_range(self, start=None, end=None, columns=None):
+        # Baris dengan start <= waktu < end sebagai frame bertipe, urut waktu (lewat indeks).
+        columns = columns or COLUMNS
+        where, params = _where(start, end)
+        sql = f"SELECT {', '.join(columns)} FROM log{where} ORDER BY waktu"
+        return _typed(pd.read_sql_query(sql, self._conn(), params=params))
+
+    def iter_chunks(self, start=None, end=None, columns=None, batch_rows=READ_CHUNK_ROWS):
+        columns = columns or COLUMNS
+        where, params = _where(start, end)
+        sql = f"SELECT {', '.join(columns)} FROM log{where} ORDER BY waktu"
+        for chunk in pd.read_sql_query(sql, self._conn(), params=params, chunksize=batch_rows):
+            yield _typed(chunk)
+
+    def count(self, start=None, end=None):
+        where, params = _where(start, end)
+        return self._conn().execute(f"SELECT COUNT(*) FROM log{where}", params).fetchone()[0]
+
+    def page(self, start=None, end=None, devices=None, offset=0, limit=PAGE_ROWS):
+        # Satu halaman terbaru dulu lewat indeks waktu (scan mundur + LIMIT), plus jumlah baris yang cocok.
+        where, params = _where(start, end, devices)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM log{where} ORDER BY waktu DESC LIMIT ? OFFSET ?"
+        df = _typed(pd.read_sql_query(sql, self._conn(), params=params + [limit, offset]))
+        total = self._conn().execute(f"SELECT COUNT(*) FROM log{where}", params).fetchone()[0]
+        return df, total
+
+    def summary(self, start=None, end=None):
+        # Statistik biaya dihitung di SQLite; hanya satu baris hasil yang dibaca.
+        where, params = _where(start, end)
+        n, total, mean = self._conn().execute(
+            f"SELECT COUNT(*), SUM(biaya), AVG(biaya) FROM log{where}", params
+        ).fetchone()
+        return {"count": n, "biaya_total": total or 0, "biaya_mean": mean or 0.0}
+
+    def reset(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM log")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
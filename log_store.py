@@ -0,0 +1,236 @@
+import csv
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from smart_data import CUACA_LIST
+
+# ------------------- SKEMA LOG -------------------
+LOG_FILE = "log_energi.csv"
+# SMART_ENERGY_LOG_BACKEND: "csv" (log_energi.csv append-only, dirotasi per SMART_ENERGY_LOG_ROTATE),
+# "sqlite" (log_energi.db, mode WAL, aman untuk banyak sesi), "binary" (log_energi.bin, record
+# 24 byte via memmap) atau "parquet" (log_energi_parquet/, partisi per tanggal).
+LOG_BACKEND = os.environ.get("SMART_ENERGY_LOG_BACKEND", "csv")
+LOG_COLUMNS = [
+    "Waktu", "Suhu (°C)", "Cahaya (%)", "Penghuni", "Cuaca", "Hari Libur",
+    "AC", "TV", "Lampu", "Daya Total (W)", "Biaya/Jam (Rp)",
+]
+WRITE_BUFFER = 64 * 1024
+READ_CHUNK_ROWS = 50_000
+
+YA_TIDAK = np.array(["Tidak", "Ya"], dtype=object)
+ON_OFF = np.array(["OFF", "ON"], dtype=object)
+
+
+def typed_log_frame(df_log):
+    # Label log_energi.csv -> kolom bertipe: waktu datetime, flag bool, cuaca kategori.
+    return pd.DataFrame({
+        "waktu": pd.to_datetime(df_log["Waktu"]).astype("datetime64[s]"),
+        "suhu": df_log["Suhu (°C)"].astype(np.float64),
+        "cahaya": df_log["Cahaya (%)"].astype(np.int16),
+        "penghuni": (df_log["Penghuni"] == "Ya").to_numpy(),
+        "cuaca": pd.Categorical(df_log["Cuaca"], categories=CUACA_LIST),
+        "hari_libur": (df_log["Hari Libur"] == "Ya").to_numpy(),
+        "ac": (df_log["AC"] == "ON").to_numpy(),
+        "tv": (df_log["TV"] == "ON").to_numpy(),
+        "lampu": (df_log["Lampu"] == "ON").to_numpy(),
+        "daya": df_log["Daya Total (W)"].astype(np.float64),
+        "biaya": df_log["Biaya/Jam (Rp)"].astype(np.int32),
+    })
+
+
+def _codes(values):
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        values = values.cat.codes
+    return np.asarray(values, dtype=np.intp)
+
+
+def _as_written(values):
+    # Kolom float yang semua nilainya bulat kembali ke int ("250", bukan "250.0"), seperti tulisan dashboard.
+    values = np.asarray(values)
+    if values.dtype.kind == "f" and np.isfinite(values).all() and (values == np.floor(values)).all():
+        return values.astype(np.int64)
+    return values
+
+
+def labelled_log_frame(rows):
+    # Kebalikan typed_log_frame. `rows` boleh DataFrame bertipe atau structured array
+    # dengan nama kolom yang sama.
+    return pd.DataFrame({
+        "Waktu": pd.DatetimeIndex(rows["waktu"]).strftime("%Y-%m-%d %H:%M:%S"),
+        "Suhu (°C)": np.asarray(rows["suhu"]),
+        "Cahaya (%)": np.asarray(rows["cahaya"]),
+        "Penghuni": YA_TIDAK[_codes(rows["penghuni"])],
+        "Cuaca": np.array(CUACA_LIST, dtype=object)[_codes(rows["cuaca"])],
+        "Hari Libur": YA_TIDAK[_codes(rows["hari_libur"])],
+        "AC": ON_OFF[_codes(rows["ac"])],
+        "TV": ON_OFF[_codes(rows["tv"])],
+        "Lampu": ON_OFF[_codes(rows["lampu"])],
+        "Daya Total (W)": _as_written(rows["daya"]),
+        "Biaya/Jam (Rp)": np.asarray(rows["biaya"]),
+    }, columns=LOG_COLUMNS)
+
+
+def iter_csv_chunks(paths, start=None, end=None, columns=None, batch_rows=READ_CHUNK_ROWS):
+    # Baca file log CSV (boleh .csv.gz) per chunk sebagai frame bertipe, difilter ke
+    # start <= waktu < end. Memori dibatasi ukuran chunk, bukan panjang log.
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        for chunk in pd.read_csv(path, chunksize=batch_rows):
+            df = typed_log_frame(chunk)
+            if start is not None:
+                df = df[df["waktu"] >= start]
+            if end is not None:
+                df = df[df["waktu"] < end]
+            if not df.empty:
+                yield df[columns] if columns else df
+
+
+# ------------------- HALAMAN LOG -------------------
+# Tabel log di dashboard hanya menampilkan satu halaman (terbaru dulu) yang diambil dari store.
+PAGE_ROWS = 50
+
+
+def device_mask(df, devices=None):
+    # `devices`: mis. {"ac": True, "lampu": False}; perangkat yang tidak disebut tidak difilter.
+    mask = np.ones(len(df), dtype=bool)
+    for name, on in (devices or {}).items():
+        mask &= np.asarray(df[name]) == on
+    return mask
+
+
+def page_from_chunks(chunks, devices=None, offset=0, limit=PAGE_ROWS):
+    # Untuk store tanpa indeks (CSV): chunk urut waktu di-scan sekali dan hanya offset + limit
+    # baris terbaru yang disimpan. Mengembalikan (halaman terbaru dulu, jumlah baris yang cocok).
+    keep = offset + limit
+    tail, total = None, 0
+    for chunk in chunks:
+        chunk = chunk[device_mask(chunk, devices)]
+        total += len(chunk)
+        tail = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+        tail = tail.iloc[-keep:] if keep else tail.iloc[:0]
+    if tail is None:
+        return typed_log_frame(pd.DataFrame(columns=LOG_COLUMNS)), 0
+    return tail.iloc[::-1].iloc[offset:offset + limit].reset_index(drop=True), total
+
+
+def recover_truncated(path, block=4096):
+    # Crash di tengah penulisan bisa meninggalkan baris terakhir tanpa "\n"; potong
+    # file kembali ke akhir baris utuh terakhir. Mengembalikan jumlah byte yang dibuang.
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+
+        end = size
+        while end > 0:
+            start = max(0, end - block)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                keep = start + pos + 1
+                break
+            end = start
+        else:
+            keep = 0  # Bahkan header belum utuh; file ditulis ulang dari awal.
+        f.truncate(keep)
+        return size - keep
+
+
+# ------------------- WRITER CSV APPEND-ONLY -------------------
+class CsvLogWriter:
+    # Hanya baris baru yang ditulis ke akhir file lewat satu handle ber-buffer yang
+    # tetap terbuka; header ditulis sekali saat file masih kosong. Satu instance
+    # dipakai bersama semua sesi, jadi penulisan memakai lock.
+    def __init__(self, path=LOG_FILE, columns=LOG_COLUMNS, autoflush=True):
+        self.path = path
+        self.columns = list(columns)
+        self.autoflush = autoflush
+        self.rows_written = 0
+        self.recovered_bytes = 0
+        self._file = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._file is not None:
+            return
+        self.recovered_bytes += recover_truncated(self.path)
+        self._file = open(self.path, "a", newline="", encoding="utf-8", buffering=WRITE_BUFFER)
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, lineterminator="\n")
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def append(self, records):
+        # `records`: list dict dengan kunci LOG_COLUMNS.
+        with self._lock:
+            self._open()
+            self._writer.writerows(records)
+            self.rows_written += len(records)
+            if self.autoflush:
+                self._file.flush()
+
+    def iter_chunks(self, start=None, end=None, columns=None, batch_rows=READ_CHUNK_ROWS):
+        self.flush()
+        yield from iter_csv_chunks([self.path], start, end, columns, batch_rows)
+
+    def page(self, start=None, end=None, devices=None, offset=0, limit=PAGE_ROWS):
+        return page_from_chunks(self.iter_chunks(start, end), devices, offset, limit)
+
+    def flush(self, fsync=False):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = self._writer = None
+
+    def reset(self):
+        # Kosongkan log; handle dibuka ulang (dengan header baru) pada append berikutnya.
+        self.close()
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------- PEMILIHAN BACKEND -------------------
+def open_log_store(backend=LOG_BACKEND):
+    # Semua backend punya append, iter_chunks, page dan reset. Modulnya baru diimpor saat
+    # dipilih, sehingga backend CSV tidak perlu memuat sqlite3/pyarrow.
+    if backend == "sqlite":
+        from log_sqlite import SqliteLogStore
+        return SqliteLogStore()
+    if backend == "binary":
+        from log_binary import BinaryLogStore
+        return BinaryLogStore()
+    if backend == "parquet":
+        from log_parquet import ParquetLogStore
+        return ParquetLogStore()
+    if backend != "csv":
+        raise ValueError(f"Backend log tidak dikenal: {backend}")
+    from log_rotation import ROTATE_PERIOD, RotatingCsvLogStore
+    if ROTATE_PERIOD != "none":
+        return RotatingCsvLogStore()
+    return CsvLogWriter()
@@ -0,0 +1,180 @@
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+from log_store import CsvLogWriter
+
+# ------------------- WRITER LOG LATAR BELAKANG -------------------
+# Satu batch ditulis saat sudah berisi FLUSH_ROWS baris atau FLUSH_S detik setelah
+# baris pertamanya masuk antrean, mana yang lebih dulu.
+FLUSH_ROWS = 500
+FLUSH_S = float(os.environ.get("SMART_ENERGY_LOG_FLUSH_S", "1.0"))
+QUEUE_SIZE = 10_000
+RETRY_S = 1.0
+# Batch yang gagal ditulis sebanyak ini dipindah ke file samping (<log>.failed.csv), supaya
+# store yang rusak (disk penuh, read-only) tidak menahan antrean selamanya.
+MAX_RETRIES = 5
+# Batas tunggu flush() dan append() saat antrean penuh, agar rerun tidak ikut menggantung.
+FLUSH_TIMEOUT_S = 10.0
+FULL_TIMEOUT_S = 1.0
+LATENCY_WINDOW = 200
+
+
+def failed_path(store):
+    # log_energi.csv -> log_energi.csv.failed.csv, log_energi_parquet -> log_energi_parquet.failed.csv.
+    base = getattr(store, "path", None) or getattr(store, "root", None)
+    if base is None:
+        raise ValueError(f"{type(store).__name__} tidak punya path/root; berikan failed_file ke BackgroundLogWriter")
+    return f"{base}.failed.csv"
+
+
+class BackgroundLogWriter:
+    # Dipasang di depan store mana pun yang punya append(records) (CsvLogWriter,
+    # SqliteLogStore, ParquetLogStore). append() hanya memasukkan baris ke antrean;
+    # penulisan ke disk (group commit) terjadi di thread sendiri, jadi latensi disk
+    # tidak masuk ke waktu rerun. Antrean dibatasi: bila penuh, append() menunggu paling
+    # lama full_timeout lalu memindah baris ke file samping. Batch yang gagal ditulis
+    # max_retries kali juga dipindah ke sana; isinya bisa di-append ulang ke store nanti.
+    # on_commit(records) dipanggil di thread writer setelah tiap batch berhasil ditulis.
+    def __init__(self, store, flush_rows=FLUSH_ROWS, flush_s=FLUSH_S, maxsize=QUEUE_SIZE, on_commit=None,
+                 max_retries=MAX_RETRIES, full_timeout=FULL_TIMEOUT_S, failed_file=None):
+        self.store = store
+        self.on_commit = on_commit
+        self.flush_rows = flush_rows
+        self.flush_s = flush_s
+        self.max_retries = max_retries
+        self.full_timeout = full_timeout
+        self.failed_file = failed_file or failed_path(store)
+        self.rows = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.full_waits = 0
+        self.failed_rows = 0
+        self.dropped_rows = 0
+        self.last_error = None
+        self._failed_writer = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._worker.start()
+
+    def append(self, records):
+        if self._closed:
+            raise RuntimeError("BackgroundLogWriter sudah ditutup")
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.full_waits += 1
+                try:
+                    self._queue.put(record, timeout=self.full_timeout)
+                except queue.Full:
+                    self._spill([record], "antrean penuh")
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return batch
+        deadline = time.perf_counter() + self.flush_s
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(record)
+            if record is None:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            stop = batch[-1] is None
+            records = [r for r in batch if r is not None]
+            attempts = 0
+            while records:
+                start = time.perf_counter()
+                try:
+                    self.store.append(records)
+                except Exception as e:
+                    # Batch dicoba lagi (bukan dibuang) sampai max_retries, lalu dipindah ke file samping.
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    attempts += 1
+                    if attempts >= self.max_retries:
+                        self._spill(records, self.last_error)
+                        break
+                    time.sleep(RETRY_S)
+                    continue
+                self._latencies.append(time.perf_counter() - start)
+                self.rows += len(records)
+                self.batches += 1
+                self.last_error = None
+                if self.on_commit is not None:
+                    try:
+                        self.on_commit(records)
+                    except Exception as e:
+                        # Batch sudah ada di store, jadi tidak diulang.
+                        self.last_error = f"on_commit {type(e).__name__}: {e}"
+                break
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _spill(self, records, reason):
+        # Dipanggil dari thread writer dan dari append() (antrean penuh).
+        try:
+            if self._failed_writer is None:
+                self._failed_writer = CsvLogWriter(self.failed_file)
+            self._failed_writer.append(records)
+            self.failed_rows += len(records)
+            self.last_error = f"{reason}; {len(records)} baris dipindah ke {self.failed_file}"
+        except Exception as e:
+            # File samping pun tidak bisa ditulis (mis. disk penuh): baris hilang, tapi tercatat.
+            self.dropped_rows += len(records)
+            self.last_error = f"{reason}; {len(records)} baris dibuang ({type(e).__name__}: {e})"
+
+    def flush(self, timeout=FLUSH_TIMEOUT_S):
+        # Tunggu sampai semua baris yang sudah di-append tertulis ke store (atau dipindah ke
+        # file samping). False jika antrean belum habis dalam `timeout` detik.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        # Flush di shutdown: sisa antrean ditulis, lalu thread berhenti.
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def stats(self):
+        lat = list(self._latencies)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "full_waits": self.full_waits,
+            "failed_rows": self.failed_rows,
+            "dropped_rows": self.dropped_rows,
+            "rows": self.rows,
+            "batches": self.batches,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+            "flush_ms_last": lat[-1] * 1000 if lat else None,
+            "flush_ms_p50": statistics.median(lat) * 1000 if lat else None,
+            "flush_ms_max": max(lat) * 1000 if lat else None,
+            "last_error": self.last_error,
+        }
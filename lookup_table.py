@@ -0,0 +1,179 @@
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+
+# ------------------- LOOKUP TABLE KEPUTUSAN -------------------
+# Semua kombinasi jam x penghuni x cuaca x hari_libur x bin suhu x bin cahaya
+# dievaluasi sekali oleh model, lalu disimpan sebagai satu byte per sel
+# (bit 0 = AC, bit 1 = TV, bit 2 = Lampu). Memuat tabel hanya butuh numpy,
+# sehingga bisa dipakai skrip kontrol Raspberry Pi tanpa sklearn.
+SUHU_BINS = 30
+CAHAYA_BINS = 50
+SUHU_RANGE = (20.0, 35.0)
+CAHAYA_RANGE = (0.0, 100.0)
+DEVICE_BITS = np.array([1, 2, 4], dtype=np.uint8)
+
+
+class LookupTable:
+    def __init__(self, table, cuaca_list, suhu_range, cahaya_range, report=None):
+        self.table = table
+        self.cuaca_list = list(cuaca_list)
+        self.suhu_range = suhu_range
+        self.cahaya_range = cahaya_range
+        self.report = report or {}
+
+    @property
+    def suhu_bins(self):
+        return self.table.shape[4]
+
+    @property
+    def cahaya_bins(self):
+        return self.table.shape[5]
+
+    def _bin(self, values, value_range, n_bins):
+        lo, hi = value_range
+        idx = np.floor((np.asarray(values, dtype=np.float64) - lo) * (n_bins / (hi - lo)))
+        return np.clip(idx, 0, n_bins - 1).astype(np.intp)
+
+    def predict(self, features):
+        # Array (n, 6) dengan urutan FEATURES dan cuaca sebagai kode, sama seperti CompiledForest.
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        packed = self.table[
+            X[:, 1].astype(np.intp),
+            X[:, 2].astype(np.intp),
+            X[:, 3].astype(np.intp),
+            X[:, 4].astype(np.intp),
+            self._bin(X[:, 0], self.suhu_range, self.suhu_bins),
+            self._bin(X[:, 5], self.cahaya_range, self.cahaya_bins),
+        ]
+        return ((packed[:, None] & DEVICE_BITS) != 0).astype(np.int64)
+
+    def lookup(self, suhu, jam, penghuni, cuaca, hari_libur, cahaya):
+        # Versi skalar untuk loop kontrol: mengembalikan (ac, tv, lampu) sebagai bool.
+        packed = int(self.table[
+            int(jam),
+            int(penghuni),
+            self.cuaca_list.index(cuaca),
+            int(hari_libur),
+            int(self._bin(suhu, self.suhu_range, self.suhu_bins)),
+            int(self._bin(cahaya, self.cahaya_range, self.cahaya_bins)),
+        ])
+        return bool(packed & 1), bool(packed & 2), bool(packed & 4)
+
+    def save(self, path):
+        # Tulis ke file sementara di direktori yang sama lalu rename, seperti model_store,
+        # supaya proses lain tidak pernah membuka tabel yang setengah jadi.
+        fd, tmp = tempfile.mkstemp(prefix=".lookup-", suffix=".npz", dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    table=self.table,
+                    cuaca_list=np.array(self.cuaca_list),
+                    suhu_range=np.array(self.suhu_range),
+                    cahaya_range=np.array(self.cahaya_range),
+                    report_keys=np.array(list(self.report.keys()), dtype=str),
+                    report_values=np.array(list(self.report.values()), dtype=np.float64),
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            report = dict(zip(data["report_keys"].tolist(), data["report_values"].tolist()))
+            return cls(
+                data["table"],
+                data["cuaca_list"].tolist(),
+                tuple(data["suhu_range"].tolist()),
+                tuple(data["cahaya_range"].tolist()),
+                report,
+            )
+
+
+# ------------------- BUILD -------------------
+def build_lookup_table(models, suhu_bins=SUHU_BINS, cahaya_bins=CAHAYA_BINS,
+                       suhu_range=SUHU_RANGE, cahaya_range=CAHAYA_RANGE, eval_rows=20000, seed=0):
+    # Import di sini agar modul ini tetap ringan untuk pemakaian load-only.
+    import pandas as pd
+    from smart_data import CUACA_LIST, TARGETS, generate_smart_data
+    from smart_model import predict_devices
+    from fast_forest import features_to_array
+
+    suhu_w = (suhu_range[1] - suhu_range[0]) / suhu_bins
+    cahaya_w = (cahaya_range[1] - cahaya_range[0]) / cahaya_bins
+    suhu_centers = suhu_range[0] + (np.arange(suhu_bins) + 0.5) * suhu_w
+    cahaya_centers = cahaya_range[0] + (np.arange(cahaya_bins) + 0.5) * cahaya_w
+
+    shape = (24, 2, len(CUACA_LIST), 2, suhu_bins, cahaya_bins)
+    jam, penghuni, cuaca, libur, s_idx, c_idx = np.indices(shape).reshape(len(shape), -1)
+    grid = pd.DataFrame({
+        "suhu": suhu_centers[s_idx],
+        "jam": jam,
+        "penghuni": penghuni,
+        "cuaca": pd.Categorical.from_codes(cuaca, categories=CUACA_LIST),
+        "hari_libur": libur,
+        "cahaya": cahaya_centers[c_idx],
+    })
+
+    start = time.perf_counter()
+    pred = predict_devices(models, grid).astype(np.uint8)
+    table = (pred @ DEVICE_BITS).astype(np.uint8).reshape(shape)
+    build_s = time.perf_counter() - start
+
+    lut = LookupTable(table, CUACA_LIST, suhu_range, cahaya_range)
+
+    # Berapa akurasi yang hilang karena binning suhu/cahaya.
+    df_eval = generate_smart_data(eval_rows, seed=seed)
+    forest_pred = predict_devices(models, df_eval)
+    table_pred = lut.predict(features_to_array(df_eval))
+    report = {"build_s": build_s, "cells": float(table.size)}
+    for i, t in enumerate(TARGETS):
+        y = df_eval[t].to_numpy()
+        report[f"acc_forest_{t}"] = float((forest_pred[:, i] == y).mean())
+        report[f"acc_table_{t}"] = float((table_pred[:, i] == y).mean())
+        report[f"agree_{t}"] = float((forest_pred[:, i] == table_pred[:, i]).mean())
+    lut.report = report
+    return lut
+
+
+def load_or_build(models, path, **kwargs):
+    try:
+        return LookupTable.load(path)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        # Tidak ada, atau rusak (mis. sisa crash dari versi lama yang menulis langsung).
+        lut = build_lookup_table(models, **kwargs)
+        lut.save(path)
+        return lut
+
+
+if __name__ == "__main__":
+    from smart_data import TARGETS
+    from smart_model import load_or_train_models
+
+    parser = argparse.ArgumentParser(description="Bangun lookup table keputusan perangkat")
+    parser.add_argument("--suhu-bins", type=int, default=SUHU_BINS)
+    parser.add_argument("--cahaya-bins", type=int, default=CAHAYA_BINS)
+    parser.add_argument("--out", default="lookup_table.npz")
+    args = parser.parse_args()
+
+    artifact, _ = load_or_train_models()
+    lut = build_lookup_table(artifact["models"], args.suhu_bins, args.cahaya_bins)
+    lut.save(args.out)
+
+    print(f"Tabel      : {lut.table.shape} = {lut.table.nbytes / 1024:.1f} KiB -> {args.out}")
+    print(f"Build      : {lut.report['build_s']:.2f} s")
+    for t in TARGETS:
+        loss = lut.report[f"acc_forest_{t}"] - lut.report[f"acc_table_{t}"]
+        print(f"{t:<6}: forest {lut.report[f'acc_forest_{t}'] * 100:.2f}%  "
+              f"tabel {lut.report[f'acc_table_{t}'] * 100:.2f}%  "
+              f"(hilang {loss * 100:+.2f} poin, sama {lut.report[f'agree_{t}'] * 100:.2f}%)")
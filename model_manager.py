@@ -0,0 +1,58 @@
+import threading
+import time
+from datetime import datetime
+
+
+# ------------------- MODEL MANAGER -------------------
+class ModelManager:
+    # Memegang referensi model aktif untuk semua sesi. Training berjalan di thread
+    # latar belakang sementara model lama tetap melayani; begitu model baru siap,
+    # referensi `active` diganti dalam satu assignment sehingga setiap rerun melihat
+    # model lama atau model baru secara utuh, tidak pernah campuran.
+    def __init__(self):
+        self.active = None
+        self.version = 0
+        self.last_error = None
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def training(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def retrain(self, build_fn, reason=""):
+        # `build_fn` mengembalikan dict {"artifact": ..., "info": ...}.
+        # False jika training lain masih berjalan.
+        with self._lock:
+            if self.training:
+                return False
+            self._worker = threading.Thread(
+                target=self._run, args=(build_fn, reason), name="model-retrain", daemon=True
+            )
+            self._worker.start()
+        return True
+
+    def wait(self, timeout=None):
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        return self.active
+
+    def _run(self, build_fn, reason):
+        start = time.perf_counter()
+        try:
+            model = build_fn()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+
+        with self._lock:
+            self.version += 1
+            self.last_error = None
+            self.active = dict(
+                model,
+                version=self.version,
+                reason=reason,
+                build_s=time.perf_counter() - start,
+                swapped_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            )
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import sklearn
+
+# ------------------- MODEL STORE -------------------
+# Artefak model disimpan per hash konfigurasi training di MODEL_DIR/<hash>/.
+# Dump joblib tidak dikompresi supaya array numpy di dalamnya bisa dibuka
+# dengan mmap_mode="r" dan dipakai bersama oleh beberapa proses server.
+MODEL_DIR = os.environ.get("SMART_ENERGY_MODEL_DIR", "models")
+# Naikkan jika isi artefak berubah, supaya artefak lama tidak dipakai lagi.
+ARTIFACT_FORMAT = 4
+ARTIFACT_FILE = "model.joblib"
+META_FILE = "meta.json"
+# Penunjuk artefak inkremental terbaru per model dasar: MODEL_DIR/latest-<hash dasar>.json.
+LATEST_FILE = "latest-{base}.json"
+
+
+def training_config(rows, seed, model_params, features, **extra):
+    config = {
+        "rows": int(rows),
+        "seed": int(seed),
+        "model_params": dict(model_params),
+        "features": list(features),
+        # Pickle sklearn tidak dijamin kompatibel antar versi.
+        "sklearn": sklearn.__version__,
+        "format": ARTIFACT_FORMAT,
+    }
+    config.update(extra)
+    return config
+
+
+def config_hash(config):
+    payload = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def artifact_dir(key, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, key)
+
+
+def save_artifact(key, artifact, meta, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    target = artifact_dir(key, model_dir)
+    # Tulis ke direktori sementara lalu rename, agar proses lain tidak pernah
+    # melihat artefak yang setengah jadi.
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=model_dir)
+    try:
+        joblib.dump(artifact, os.path.join(tmp, ARTIFACT_FILE))
+        with open(os.path.join(tmp, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2, sort_keys=True)
+        os.rename(tmp, target)
+    except OSError:
+        # Proses lain sudah menyimpan hash yang sama lebih dulu.
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(target, META_FILE)):
+            raise
+    return target
+
+
+def load_artifact(key, model_dir=MODEL_DIR, mmap_mode="r"):
+    path = artifact_dir(key, model_dir)
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    artifact = joblib.load(os.path.join(path, ARTIFACT_FILE), mmap_mode=mmap_mode)
+    return artifact, meta
+
+
+def save_latest(base_key, key, trained_until, model_dir=MODEL_DIR):
+    # Ditulis ke file sementara lalu di-replace, jadi pembaca selalu melihat penunjuk lama atau baru.
+    os.makedirs(model_dir, exist_ok=True)
+    pointer = {"key": key, "trained_until": trained_until, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}
+    fd, tmp = tempfile.mkstemp(prefix=".latest-", dir=model_dir)
+    with os.fdopen(fd, "w") as f:
+        json.dump(pointer, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(model_dir, LATEST_FILE.format(base=base_key)))
+    return pointer
+
+
+def load_latest(base_key, model_dir=MODEL_DIR):
+    # None jika belum ada artefak inkremental untuk model dasar ini.
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE.format(base=base_key))) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_or_train(config, train_fn, model_dir=MODEL_DIR):
+    key = config_hash(config)
+
+    start = time.perf_counter()
+    try:
+        loaded = load_artifact(key, model_dir)
+    except Exception:
+        # Artefak rusak atau tidak bisa dibaca: buang dan latih ulang.
+        shutil.rmtree(artifact_dir(key, model_dir), ignore_errors=True)
+        loaded = None
+
+    if loaded is not None:
+        artifact, meta = loaded
+        info = {
+            "key": key,
+            "source": "disk",
+            "load_s": time.perf_counter() - start,
+            "train_s": meta["train_s"],
+        }
+        return artifact, info
+
+    start = time.perf_counter()
+    artifact = train_fn()
+    train_s = time.perf_counter() - start
+    meta = {"config": config, "train_s": train_s, "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    save_artifact(key, artifact, meta, model_dir)
+
+    info = {"key": key, "source": "train", "load_s": None, "train_s": train_s}
+    return artifact, info
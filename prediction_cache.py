@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from smart_data import FEATURES
+
+# ------------------- LRU CACHE PREDIKSI -------------------
+# Langkah kuantisasi per fitur; fitur yang tidak disebut (jam, penghuni, cuaca,
+# hari_libur) dipakai apa adanya. suhu 0.5 berarti 27.1 dan 27.4 berbagi entri.
+DEFAULT_QUANTIZE = {"suhu": 0.5, "cahaya": 5.0}
+DEFAULT_MAXSIZE = 4096
+
+
+class PredictionCache:
+    # Dipasang di depan predictor mana pun yang punya predict(array (n, 6)).
+    # Satu instance dipakai bersama semua sesi, jadi semua akses memakai lock.
+    def __init__(self, predictor, maxsize=DEFAULT_MAXSIZE, quantize=None):
+        self.predictor = predictor
+        self.maxsize = maxsize
+        quantize = DEFAULT_QUANTIZE if quantize is None else quantize
+        self._steps = np.array([quantize.get(f, 0.0) for f in FEATURES], dtype=np.float64)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def keys(self, X):
+        steps = np.where(self._steps > 0, self._steps, 1.0)
+        q = np.where(self._steps > 0, np.floor(X / steps), X)
+        return list(map(tuple, q.tolist()))
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        keys = self.keys(X)
+
+        out = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    out[i] = value
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Semua baris yang belum ada di cache diprediksi dalam satu panggilan.
+            pred = self.predictor.predict(X[missing])
+            with self._lock:
+                for i, row in zip(missing, pred):
+                    out[i] = row
+                    self._entries[keys[i]] = row
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return np.array(out)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
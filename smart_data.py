@@ -0,0 +1,151 @@
+import argparse
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from smart_rules import evaluate_rules
+
+# ------------------- SKEMA DATA -------------------
+FEATURES = ["suhu", "jam", "penghuni", "cuaca", "hari_libur", "cahaya"]
+TARGETS = ["ac", "tv", "lampu"]
+CUACA_LIST = ["cerah", "hujan", "mendung"]
+
+# Daya perangkat (W) saat ON, beban lain yang selalu menyala, dan tarif listrik (Rp/kWh).
+DAYA_PERANGKAT = {"ac": 1500, "tv": 100, "lampu": 250}
+DAYA_LAIN = 250
+TARIF_PER_KWH = 1900
+
+DEFAULT_ROWS = 1000
+DEFAULT_SEED = 42
+
+
+# ------------------- ATURAN LABEL -------------------
+def label_devices(suhu, jam, penghuni, cuaca, hari_libur, cahaya):
+    # Label dihitung dari smart_rules.RULES sekaligus untuk seluruh array.
+    # `cuaca` boleh berupa kode (0=cerah, 1=hujan, 2=mendung) atau string.
+    columns = {
+        "suhu": suhu,
+        "jam": jam,
+        "penghuni": penghuni,
+        "cuaca": cuaca,
+        "hari_libur": hari_libur,
+        "cahaya": cahaya,
+    }
+    labels = evaluate_rules(columns, {"cuaca": CUACA_LIST})
+    return tuple(labels[t].astype(np.int8) for t in TARGETS)
+
+
+# ------------------- DAYA & BIAYA -------------------
+def daya_total(states):
+    # states: array (n, 3) berisi 0/1 dengan urutan TARGETS -> daya total (W) per baris.
+    watt = np.array([DAYA_PERANGKAT[t] for t in TARGETS])
+    return np.asarray(states) @ watt + DAYA_LAIN
+
+
+def biaya_per_jam(daya):
+    return np.asarray(daya) / 1000 * TARIF_PER_KWH
+
+
+# ------------------- GENERATOR DATASET -------------------
+def generate_smart_data(n=DEFAULT_ROWS, seed=DEFAULT_SEED):
+    # Semua kolom diambil dari satu Generator dengan urutan tetap, sehingga
+    # seed + n yang sama selalu menghasilkan dataset yang identik per bit.
+    rng = np.random.default_rng(seed)
+    suhu = rng.uniform(20, 35, n)
+    jam = rng.integers(0, 24, n, dtype=np.int8)
+    penghuni = rng.integers(0, 2, n, dtype=np.int8)
+    cuaca_code = rng.integers(0, len(CUACA_LIST), n, dtype=np.int8)
+    hari_libur = rng.integers(0, 2, n, dtype=np.int8)
+    cahaya = rng.uniform(0, 100, n)
+
+    ac, tv, lampu = label_devices(suhu, jam, penghuni, cuaca_code, hari_libur, cahaya)
+
+    return pd.DataFrame({
+        "suhu": suhu,
+        "jam": jam,
+        "penghuni": penghuni,
+        "cuaca": pd.Categorical.from_codes(cuaca_code, categories=CUACA_LIST),
+        "hari_libur": hari_libur,
+        "cahaya": cahaya,
+        "ac": ac,
+        "tv": tv,
+        "lampu": lampu,
+    })
+
+
+# ------------------- DATA LOG -------------------
+def log_to_training_frame(df_log):
+    # Baris log_energi.csv (label Indonesia) -> fitur + status akhir perangkat,
+    # termasuk override manual, dalam skema yang sama dengan generate_smart_data.
+    waktu = pd.to_datetime(df_log["Waktu"])
+    return pd.DataFrame({
+        "waktu": waktu,
+        "suhu": df_log["Suhu (°C)"].astype(np.float64),
+        "jam": waktu.dt.hour.astype(np.int8),
+        "penghuni": (df_log["Penghuni"] == "Ya").astype(np.int8),
+        "cuaca": pd.Categorical(df_log["Cuaca"], categories=CUACA_LIST),
+        "hari_libur": (df_log["Hari Libur"] == "Ya").astype(np.int8),
+        "cahaya": df_log["Cahaya (%)"].astype(np.float64),
+        "ac": (df_log["AC"] == "ON").astype(np.int8),
+        "tv": (df_log["TV"] == "ON").astype(np.int8),
+        "lampu": (df_log["Lampu"] == "ON").astype(np.int8),
+    })
+
+
+def generate_log_frame(start, periods, freq="40s", seed=DEFAULT_SEED):
+    # Log sintetis dengan skema log_energi.csv dan simulasi sensor yang sama seperti
+    # dashboard (satu baris per autorefresh 40 s), untuk benchmark penyimpanan log.
+    rng = np.random.default_rng(seed)
+    waktu = pd.date_range(start, periods=periods, freq=freq)
+    suhu = rng.uniform(24.0, 33.0, periods).round(1)
+    cahaya = rng.integers(0, 101, periods)
+    penghuni = rng.integers(0, 2, periods)
+    cuaca = rng.integers(0, len(CUACA_LIST), periods)
+    hari_libur = rng.integers(0, 2, periods)
+
+    states = np.column_stack(label_devices(suhu, waktu.hour.to_numpy(), penghuni, cuaca, hari_libur, cahaya))
+    daya = daya_total(states)
+    ya_tidak = np.array(["Tidak", "Ya"], dtype=object)
+    on_off = np.array(["OFF", "ON"], dtype=object)
+    return pd.DataFrame({
+        "Waktu": waktu.strftime("%Y-%m-%d %H:%M:%S"),
+        "Suhu (°C)": suhu,
+        "Cahaya (%)": cahaya,
+        "Penghuni": ya_tidak[penghuni],
+        "Cuaca": np.array(CUACA_LIST, dtype=object)[cuaca],
+        "Hari Libur": ya_tidak[hari_libur],
+        "AC": on_off[states[:, 0]],
+        "TV": on_off[states[:, 1]],
+        "Lampu": on_off[states[:, 2]],
+        "Daya Total (W)": daya,
+        "Biaya/Jam (Rp)": biaya_per_jam(daya).astype(np.int64),
+    })
+
+
+def dataset_digest(df):
+    # Sidik jari dataset untuk memastikan dua run benchmark memakai data yang sama.
+    h = hashlib.sha256()
+    for col in df.columns:
+        values = df[col].cat.codes if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+        h.update(col.encode())
+        h.update(np.ascontiguousarray(values.to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate dataset sintetis Smart Energy")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = generate_smart_data(args.rows, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Baris      : {len(df):,}")
+    print(f"Waktu      : {elapsed:.3f} s ({len(df) / elapsed:,.0f} baris/s)")
+    print(f"Memori     : {df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(f"Digest     : {dataset_digest(df)}")
+    print(df[TARGETS].mean().rename("rasio ON").to_string())
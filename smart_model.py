@@ -0,0 +1,232 @@
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report
+
+import model_store
+from fast_forest import compile_models
+from log_store import labelled_log_frame
+from smart_data import FEATURES, TARGETS, generate_smart_data, log_to_training_frame
+
+# ------------------- KONFIGURASI TRAINING -------------------
+TRAIN_ROWS = 1000
+DATA_SEED = 42
+MODEL_PARAMS = {"n_estimators": 100, "max_depth": 10, "random_state": 42}
+# SMART_ENERGY_MULTI_OUTPUT=1 mengganti tiga forest terpisah dengan satu forest multi-output.
+MULTI_OUTPUT = os.environ.get("SMART_ENERGY_MULTI_OUTPUT", "0") == "1"
+
+# Training inkremental: pohon baru per chunk log, dan batas jumlah pohon per forest.
+TREES_PER_CHUNK = 10
+LOG_CHUNK_ROWS = 5000
+MAX_TREES = 300
+
+
+def build_pipeline(model_params=MODEL_PARAMS):
+    transformer = ColumnTransformer([("cuaca", OneHotEncoder(), ["cuaca"])], remainder="passthrough")
+    return Pipeline([("pre", transformer), ("clf", RandomForestClassifier(**model_params))])
+
+
+# ------------------- TRAINING -------------------
+def split_training_data(df):
+    # Satu split untuk ketiga target, sehingga semua model melihat baris train/test yang sama.
+    return train_test_split(df[FEATURES], df[TARGETS], test_size=0.2, random_state=42)
+
+
+def evaluate_models(models, df):
+    # Semua yang ditampilkan sidebar "Evaluasi Model" dihitung sekali di sini dan
+    # disimpan di artefak, sehingga dashboard tidak perlu menilai ulang dataset.
+    _, X_test, _, y_test = split_training_data(df)
+    y_pred_test = predict_devices(models, X_test)
+    y_pred_all = predict_devices(models, df[FEATURES])
+
+    accuracy = {t: accuracy_score(y_test[t], y_pred_test[:, i]) for i, t in enumerate(TARGETS)}
+    metrics = {
+        "reports": {t: classification_report(df[t], y_pred_all[:, i]) for i, t in enumerate(TARGETS)},
+        "corr": df.corr(numeric_only=True),
+        "target_counts": df[TARGETS].apply(pd.Series.value_counts).fillna(0),
+    }
+    return accuracy, metrics
+
+
+def train_models(rows=TRAIN_ROWS, seed=DATA_SEED, model_params=MODEL_PARAMS, multi_output=MULTI_OUTPUT):
+    df = generate_smart_data(rows, seed=seed)
+    X_train, _, y_train, _ = split_training_data(df)
+
+    if multi_output:
+        # Satu forest multi-output: satu kali one-hot dan satu kali traversal pohon untuk AC/TV/Lampu.
+        models = {"multi": build_pipeline(model_params).fit(X_train, y_train)}
+    else:
+        models = {t: build_pipeline(model_params).fit(X_train, y_train[t]) for t in TARGETS}
+
+    accuracy, metrics = evaluate_models(models, df)
+    return {"models": models, "accuracy": accuracy, "metrics": metrics, "compiled": compile_models(models)}
+
+
+# ------------------- TRAINING INKREMENTAL DARI LOG -------------------
+def _add_trees(pipe, X, y, n_new, max_trees):
+    clf = pipe.named_steps["clf"]
+    y = np.asarray(y)
+    # Pohon baru harus mengenal semua kelas lama, kalau tidak predict_proba forest tidak bisa digabung.
+    classes = clf.classes_ if clf.n_outputs_ > 1 else [clf.classes_]
+    y_cols = y.reshape(len(y), -1)
+    if any(len(np.unique(y_cols[:, o])) < len(c) for o, c in enumerate(classes)):
+        return 0
+
+    # One-hot tetap memakai encoder lama; hanya forest yang ditambah pohon (warm start).
+    clf.set_params(warm_start=True, n_estimators=len(clf.estimators_) + n_new)
+    clf.fit(pipe.named_steps["pre"].transform(X), y)
+    if max_trees and len(clf.estimators_) > max_trees:
+        # Buang pohon tertua agar ukuran model tetap terbatas.
+        clf.estimators_ = clf.estimators_[-max_trees:]
+        clf.n_estimators = max_trees
+    return n_new
+
+
+def _log_chunks(log, chunk_rows, since=None):
+    # `log`: path CSV, atau store log (SqliteLogStore, ParquetLogStore) yang punya iter_chunks.
+    if isinstance(log, (str, os.PathLike)):
+        yield from pd.read_csv(log, chunksize=chunk_rows)
+    else:
+        for chunk in log.iter_chunks(start=since, batch_rows=chunk_rows):
+            yield labelled_log_frame(chunk)
+
+
+def update_models_from_log(artifact, log_path, since=None, trees_per_chunk=TREES_PER_CHUNK,
+                           chunk_rows=LOG_CHUNK_ROWS, max_trees=MAX_TREES, rows=TRAIN_ROWS, seed=DATA_SEED):
+    # Model yang sedang dipakai tidak diubah; hasilnya artefak baru.
+    models = copy.deepcopy(artifact["models"])
+    stats = {"rows": 0, "chunks": 0, "skipped_chunks": 0, "trees_added": 0, "train_s": 0.0}
+    trained_until = None if since is None else pd.Timestamp(since)
+
+    # Log dibaca per chunk, jadi memori tidak tumbuh mengikuti ukuran file.
+    for df_log in _log_chunks(log_path, chunk_rows, since):
+        df = log_to_training_frame(df_log)
+        if since is not None:
+            df = df[df["waktu"] > pd.Timestamp(since)]
+        if df.empty:
+            continue
+
+        start = time.perf_counter()
+        if "multi" in models:
+            added = _add_trees(models["multi"], df[FEATURES], df[TARGETS], trees_per_chunk, max_trees)
+        else:
+            added = sum(_add_trees(models[t], df[FEATURES], df[t], trees_per_chunk, max_trees) for t in TARGETS)
+        stats["train_s"] += time.perf_counter() - start
+
+        stats["rows"] += len(df)
+        stats["chunks"] += 1
+        stats["skipped_chunks"] += added == 0
+        stats["trees_added"] += added
+        trained_until = max(trained_until or df["waktu"].max(), df["waktu"].max())
+
+    stats["s_per_1k_rows"] = stats["train_s"] / stats["rows"] * 1000 if stats["rows"] else None
+
+    accuracy, metrics = evaluate_models(models, generate_smart_data(rows, seed=seed))
+    updated = {
+        "models": models,
+        "accuracy": accuracy,
+        "metrics": metrics,
+        "compiled": compile_models(models),
+        "trained_until": str(trained_until) if trained_until is not None else None,
+    }
+    return updated, stats
+
+
+# ------------------- PREDIKSI -------------------
+def predict_devices(models, X):
+    # Hasil berbentuk (n, 3) dengan urutan kolom TARGETS (ac, tv, lampu).
+    if "multi" in models:
+        return np.asarray(models["multi"].predict(X))
+    return np.column_stack([models[t].predict(X) for t in TARGETS])
+
+
+def load_or_train_models(rows=TRAIN_ROWS, seed=DATA_SEED, model_params=MODEL_PARAMS,
+                         multi_output=MULTI_OUTPUT, model_dir=model_store.MODEL_DIR):
+    config = model_store.training_config(
+        rows, seed, model_params, FEATURES, targets=TARGETS, multi_output=bool(multi_output)
+    )
+    return model_store.load_or_train(
+        config, lambda: train_models(rows, seed, model_params, multi_output), model_dir=model_dir
+    )
+
+
+def load_latest_models(model_dir=model_store.MODEL_DIR):
+    # Artefak inkremental terbaru (lewat penunjuk latest di model store) untuk model dasar
+    # saat ini; model dasar jika belum pernah dilatih dari log atau artefaknya tidak terbaca.
+    base, info = load_or_train_models(model_dir=model_dir)
+    latest = model_store.load_latest(info["key"], model_dir)
+    if latest is not None:
+        start = time.perf_counter()
+        try:
+            loaded = model_store.load_artifact(latest["key"], model_dir)
+        except Exception:
+            loaded = None
+        if loaded is not None:
+            artifact, meta = loaded
+            return artifact, {
+                "key": latest["key"],
+                "base": info["key"],
+                "source": "log",
+                "load_s": time.perf_counter() - start,
+                "train_s": meta["train_s"],
+            }
+    return base, dict(info, base=info["key"])
+
+
+def incremental_update(log_path, since=None, model_dir=model_store.MODEL_DIR, **kwargs):
+    # Melanjutkan dari artefak inkremental terbaru, sehingga hanya baris log setelah
+    # trained_until-nya yang dibaca. Hasilnya disimpan di store dengan kunci turunan dari
+    # artefak awal + posisi log, lalu penunjuk latest dipindah ke sana.
+    current, info = load_latest_models(model_dir)
+    since = since or current.get("trained_until")
+    updated, stats = update_models_from_log(current, log_path, since=since, **kwargs)
+    if stats["rows"] == 0:
+        # Tidak ada baris baru: artefak yang sekarang tetap yang terbaru.
+        return current, dict(stats, key=info["key"])
+
+    config = {
+        "base": info["key"],
+        "log_until": updated["trained_until"],
+        "trees_per_chunk": kwargs.get("trees_per_chunk", TREES_PER_CHUNK),
+    }
+    key = model_store.config_hash(config)
+    meta = {"config": config, "train_s": stats["train_s"], "stats": stats, "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    model_store.save_artifact(key, updated, meta, model_dir)
+    model_store.save_latest(info["base"], key, updated["trained_until"], model_dir)
+    return updated, dict(stats, key=key)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training / load model Smart Energy")
+    parser.add_argument("--incremental", metavar="LOG_CSV", help="tambah pohon dari data log (warm start)")
+    parser.add_argument("--since", help="hanya baris log setelah waktu ini")
+    parser.add_argument("--trees-per-chunk", type=int, default=TREES_PER_CHUNK)
+    parser.add_argument("--chunk-rows", type=int, default=LOG_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.incremental:
+        artifact, stats = incremental_update(
+            args.incremental, args.since, trees_per_chunk=args.trees_per_chunk, chunk_rows=args.chunk_rows
+        )
+        print(f"Model      : {stats['key']} (inkremental sampai {artifact.get('trained_until')})")
+        print(f"Baris log  : {stats['rows']:,} dalam {stats['chunks']} chunk ({stats['skipped_chunks']} dilewati)")
+        print(f"Pohon baru : {stats['trees_added']}")
+        if stats["s_per_1k_rows"] is not None:
+            print(f"Training   : {stats['train_s']:.3f} s ({stats['s_per_1k_rows']:.3f} s per 1000 baris)")
+    else:
+        artifact, info = load_or_train_models()
+        print(f"Model      : {info['key']} ({info['source']})")
+        print(f"Training   : {info['train_s']:.3f} s")
+        if info["load_s"] is not None:
+            print(f"Load disk  : {info['load_s']:.3f} s ({info['train_s'] / info['load_s']:.1f}x lebih cepat)")
+    for target, acc in artifact["accuracy"].items():
+        print(f"Akurasi {target:<6}: {acc * 100:.2f}%")
@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+# ------------------- ATURAN PERANGKAT -------------------
+# Aturan ditulis sebagai data: daun (kolom, operator, nilai) dan simpul
+# ("and" | "or" | "not", anak...). Aturan yang sama dipakai untuk membuat label
+# training (smart_data.label_devices) dan sebagai mode prediksi tanpa forest.
+RULES = {
+    "ac": ("and",
+           ("penghuni", "!=", 0),
+           ("or",
+            ("suhu", ">", 30),
+            ("and", ("suhu", ">", 27), ("cuaca", "==", "cerah")))),
+    "tv": ("and",
+           ("penghuni", "!=", 0),
+           ("or",
+            ("and", ("jam", ">=", 18), ("jam", "<=", 22)),
+            ("and", ("hari_libur", "!=", 0), ("jam", ">=", 9), ("jam", "<=", 23)))),
+    "lampu": ("and",
+              ("penghuni", "!=", 0),
+              ("or", ("jam", ">=", 18), ("jam", "<", 6), ("cahaya", "<", 30))),
+}
+
+OPERATORS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def evaluate_rule(rule, columns, categories=None):
+    # `columns` memetakan nama kolom ke array; kolom kategori boleh berisi string
+    # atau kode numerik sesuai urutan `categories[kolom]`.
+    head = rule[0]
+    if head == "and":
+        return np.logical_and.reduce([evaluate_rule(r, columns, categories) for r in rule[1:]])
+    if head == "or":
+        return np.logical_or.reduce([evaluate_rule(r, columns, categories) for r in rule[1:]])
+    if head == "not":
+        return ~evaluate_rule(rule[1], columns, categories)
+
+    col, op, value = rule
+    values = np.asarray(columns[col])
+    if isinstance(value, str) and values.dtype.kind in "iuf":
+        value = categories[col].index(value)
+    return OPERATORS[op](values, value)
+
+
+def evaluate_rules(columns, categories=None, rules=RULES):
+    return {target: evaluate_rule(rule, columns, categories) for target, rule in rules.items()}
+
+
+# ------------------- MODE PREDIKSI RULES -------------------
+class RulesEngine:
+    # Predictor dengan antarmuka yang sama seperti CompiledForest/LookupTable:
+    # predict(array (n, fitur)) -> array (n, jumlah target) berisi 0/1.
+    def __init__(self, feature_names, categories=None, rules=RULES):
+        self.feature_names = list(feature_names)
+        self.categories = categories or {}
+        self.rules = rules
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        columns = {name: X[:, i] for i, name in enumerate(self.feature_names)}
+        result = evaluate_rules(columns, self.categories, self.rules)
+        return np.column_stack([result[t] for t in self.rules]).astype(np.int64)
+
+
+class ShadowAuditor:
+    # Menjalankan `primary` untuk setiap prediksi dan, untuk sebagian baris yang
+    # diambil acak, juga `shadow` (forest) agar tingkat ketidaksesuaian tercatat.
+    def __init__(self, primary, shadow, targets, sample_rate=0.1, keep_examples=20, seed=None):
+        self.primary = primary
+        self.shadow = shadow
+        self.targets = list(targets)
+        self.sample_rate = sample_rate
+        self.checked = 0
+        self.disagree = dict.fromkeys(self.targets, 0)
+        self.examples = deque(maxlen=keep_examples)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        pred = self.primary.predict(X)
+
+        with self._lock:
+            sampled = np.flatnonzero(self._rng.random(len(X)) < self.sample_rate)
+        if len(sampled):
+            shadow_pred = self.shadow.predict(X[sampled])
+            diff = shadow_pred != pred[sampled]
+            with self._lock:
+                self.checked += len(sampled)
+                for k, t in enumerate(self.targets):
+                    self.disagree[t] += int(diff[:, k].sum())
+                for row, d in zip(sampled, diff.any(axis=1)):
+                    if d:
+                        self.examples.append((X[row].tolist(), pred[row].tolist()))
+        return pred
+
+    def disagreement_rate(self):
+        with self._lock:
+            if not self.checked:
+                return dict.fromkeys(self.targets, 0.0)
+            return {t: n / self.checked for t, n in self.disagree.items()}
@@ -0,0 +1,93 @@
+import argparse
+import itertools
+import os
+import pickle
+import resource
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmark import measure
+from fast_forest import features_to_array
+from smart_data import FEATURES, TARGETS, generate_smart_data
+from smart_model import TRAIN_ROWS, DATA_SEED, MODEL_PARAMS, train_models, predict_devices
+
+# ------------------- SWEEP HYPERPARAMETER -------------------
+# Setiap konfigurasi dilatih di proses baru (max_tasks_per_child=1), sehingga
+# angka RSS tidak tercampur dengan model dari konfigurasi sebelumnya.
+BATCH_ROWS = 1000
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        # Bukan Linux: pakai puncak RSS (ru_maxrss dalam KB).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def evaluate_config(params, rows, seed, multi_output):
+    rss_before = _rss_mb()
+    artifact = train_models(rows, seed, dict(MODEL_PARAMS, **params), multi_output=multi_output)
+    models, compiled = artifact["models"], artifact["compiled"]
+
+    df_eval = generate_smart_data(BATCH_ROWS, seed=seed + 1)
+    X_one, X_batch = df_eval[FEATURES].iloc[:1], df_eval[FEATURES]
+    A_one, A_batch = features_to_array(X_one), features_to_array(X_batch)
+
+    result = dict(params)
+    for t in TARGETS:
+        result[f"akurasi {t}"] = round(artifact["accuracy"][t], 4)
+    result["akurasi min"] = min(artifact["accuracy"].values())
+    result["1 baris (ms)"] = round(measure(lambda: predict_devices(models, X_one), 20) * 1000, 3)
+    result[f"{BATCH_ROWS} baris (ms)"] = round(measure(lambda: predict_devices(models, X_batch), 5) * 1000, 2)
+    result["compiled 1 baris (ms)"] = round(measure(lambda: compiled.predict(A_one), 20) * 1000, 3)
+    result[f"compiled {BATCH_ROWS} baris (ms)"] = round(measure(lambda: compiled.predict(A_batch), 5) * 1000, 2)
+    result["ukuran (KB)"] = round(len(pickle.dumps(models, protocol=pickle.HIGHEST_PROTOCOL)) / 1024, 1)
+    result["RSS model (MB)"] = round(_rss_mb() - rss_before, 1)
+    return result
+
+
+def run_sweep(grid, rows=TRAIN_ROWS, seed=DATA_SEED, multi_output=False, workers=None):
+    keys = list(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(evaluate_config, c, rows, seed, multi_output) for c in configs]
+        return pd.DataFrame([f.result() for f in futures])
+
+
+def cheapest(results, min_accuracy, by="compiled 1 baris (ms)"):
+    ok = results[results["akurasi min"] >= min_accuracy]
+    return None if ok.empty else ok.sort_values([by, "ukuran (KB)"]).iloc[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep hyperparameter model perangkat")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--max-depth", type=int, nargs="+", default=[4, 6, 8, 10, 0], help="0 = tanpa batas")
+    parser.add_argument("--rows", type=int, default=TRAIN_ROWS)
+    parser.add_argument("--seed", type=int, default=DATA_SEED)
+    parser.add_argument("--multi-output", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-accuracy", type=float, default=0.98)
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    grid = {
+        "n_estimators": args.n_estimators,
+        "max_depth": [d or None for d in args.max_depth],
+    }
+    results = run_sweep(grid, args.rows, args.seed, args.multi_output, args.workers)
+    results.to_csv(args.out, index=False)
+    print(results.to_string(index=False))
+    print(f"\nHasil disimpan ke {args.out}")
+
+    best = cheapest(results, args.min_accuracy)
+    if best is None:
+        print(f"Tidak ada konfigurasi dengan akurasi minimal {args.min_accuracy:.2%}")
+    else:
+        max_depth = None if pd.isna(best["max_depth"]) else int(best["max_depth"])
+        print(f"Termurah dengan akurasi >= {args.min_accuracy:.2%}: "
+              f"n_estimators={int(best['n_estimators'])}, max_depth={max_depth} "
+              f"({best['compiled 1 baris (ms)']} ms/baris, {best['ukuran (KB)']} KB)")
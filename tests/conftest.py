@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul dashboard ada di root repo (tanpa package), jadi root ditambahkan ke sys.path.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
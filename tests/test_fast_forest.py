@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import fast_forest
+from fast_forest import as_features, compile_models, features_to_array
+from smart_data import FEATURES, generate_smart_data
+from smart_model import predict_devices, train_models
+
+PARAMS = {"n_estimators": 20, "max_depth": 10, "random_state": 42}
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["per_target", "multi_output"])
+def models(request):
+    return train_models(rows=1000, seed=42, model_params=PARAMS, multi_output=request.param)["models"]
+
+
+def test_compiled_matches_sklearn(models):
+    df = generate_smart_data(5000, seed=7)
+    compiled = compile_models(models)
+    expected = predict_devices(models, df[FEATURES])
+    X = features_to_array(df)
+    np.testing.assert_array_equal(compiled.predict(X), expected)
+    np.testing.assert_array_equal(compiled.traverse(X), expected)
+    np.testing.assert_array_equal(compiled.predict_forests(X), expected)
+
+
+def test_large_batches_go_to_forests(models, monkeypatch):
+    compiled = compile_models(models)
+    X = features_to_array(generate_smart_data(fast_forest.SKLEARN_ROWS + 1, seed=9))
+    traversed = []
+    monkeypatch.setattr(compiled, "traverse", lambda f: traversed.append(len(f)))
+    compiled.predict(X)
+    compiled.predict(X[:fast_forest.SKLEARN_ROWS])
+    assert traversed == [fast_forest.SKLEARN_ROWS]
+
+    compiled.forests = None
+    compiled.predict(X)
+    assert traversed == [fast_forest.SKLEARN_ROWS, len(X)]
+
+
+def test_predict_one_matches_batch(models):
+    df = generate_smart_data(200, seed=8)
+    compiled = compile_models(models)
+    batch = compiled.predict(features_to_array(df))
+    for i, row in enumerate(df[FEATURES].itertuples(index=False)):
+        reading = tuple(str(v) if name == "cuaca" else v for name, v in zip(FEATURES, row))
+        np.testing.assert_array_equal(compiled.predict_one(reading), batch[i])
+
+
+def test_as_features_accepts_tuple_dict_and_codes():
+    reading = (25.0, 3, 1, "hujan", 0, 10)
+    expected = np.array([[25.0, 3, 1, 1, 0, 10]])
+    np.testing.assert_array_equal(as_features(reading), expected)
+    np.testing.assert_array_equal(as_features(dict(zip(FEATURES, reading))), expected)
+    np.testing.assert_array_equal(as_features([(25.0, 3, 1, 1, 0, 10)]), expected)
+
+
+def test_as_features_accepts_string_arrays():
+    # Bacaan campuran lewat np.array jadi dtype string (<U32).
+    expected = np.array([[25.0, 14, 1, 0, 0, 50.0], [26.5, 2, 0, 2, 1, 5]])
+    X = np.array([(25.0, 14, 1, "cerah", 0, 50.0), (26.5, 2, 0, "mendung", 1, 5)])
+    np.testing.assert_array_equal(as_features(X), expected)
+    np.testing.assert_array_equal(as_features(X.astype("S")), expected)
+    np.testing.assert_array_equal(as_features(X[0]), expected[:1])
+    np.testing.assert_array_equal(as_features(np.array([(26.5, 2, 0, "2", 1, 5)])), expected[1:])
+
+
+@pytest.mark.parametrize("reading", [
+    (25.0, 3, 1, "cerah", 0),
+    (25.0, 3, 1, "cerah", 0, 10, 1),
+    (25.0, 3, 1, None, 0, 10),
+    (25.0, 3, 1, float("nan"), 0, 10),
+    (25.0, 3, 1, "salju", 0, 10),
+    (25.0, 3, 1, 3, 0, 10),
+    (float("inf"), 3, 1, "cerah", 0, 10),
+    np.array([[25.0, 3, 1, 0, 0]]),
+    [],
+    np.array([(25.0, 14, 1, "salju", 0, 50.0)]),
+    np.array([("panas", 14, 1, "cerah", 0, 50.0)]),
+    np.array([(25.0, 14, 1, "cerah", 0)]),
+])
+def test_as_features_rejects_invalid_readings(reading):
+    with pytest.raises(ValueError):
+        as_features(reading)
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from log_binary import BinaryLogStore, _shortest, binary_to_csv, csv_to_binary, decode_records
+from log_store import LOG_FILE, CsvLogWriter, labelled_log_frame
+from smart_data import generate_log_frame
+
+REPO_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), LOG_FILE)
+
+
+def _round_trip(csv_path, tmp_path, chunk_rows=1000):
+    bin_path, out_path = tmp_path / "log.bin", tmp_path / "kembali.csv"
+    csv_to_binary(csv_path, bin_path, chunk_rows)
+    binary_to_csv(bin_path, out_path, chunk_rows)
+    with open(csv_path, "rb") as a, open(out_path, "rb") as b:
+        return a.read(), b.read()
+
+
+def test_pandas_written_log_round_trips(tmp_path):
+    path = tmp_path / "log.csv"
+    generate_log_frame("2025-07-01", 5000).to_csv(path, index=False, lineterminator="\n")
+    original, result = _round_trip(path, tmp_path)
+    assert result == original
+
+
+def test_dashboard_written_log_round_trips(tmp_path):
+    path = tmp_path / "log.csv"
+    df = generate_log_frame("2025-07-01", 2000, seed=3)
+    # Seperti dashboard: satu dict per baris berisi int/float Python, ditulis csv.DictWriter.
+    with CsvLogWriter(str(path)) as writer:
+        writer.append(df.to_dict("records"))
+    original, result = _round_trip(path, tmp_path)
+    assert result == original
+
+
+def test_repo_log_round_trips(tmp_path):
+    original, result = _round_trip(REPO_LOG, tmp_path)
+    assert result == original
+
+
+def test_empty_log_round_trips_header(tmp_path):
+    path = tmp_path / "log.csv"
+    generate_log_frame("2025-07-01", 0).to_csv(path, index=False, lineterminator="\n")
+    original, result = _round_trip(path, tmp_path)
+    assert result == original
+
+
+def test_shortest_gives_float32_repr():
+    rng = np.random.default_rng(0)
+    scale = 10.0 ** rng.integers(0, 4, 2000)
+    values = np.concatenate([
+        np.round(rng.uniform(-50, 50, 2000) * scale) / scale,
+        rng.uniform(0, 1e6, 500),
+        [0.0, 1e-8, 3e9, -0.1],
+    ]).astype(np.float32)
+    out = _shortest(values)
+    np.testing.assert_array_equal(out.astype(np.float32), values)
+    assert [repr(v) for v in out.tolist()] == [repr(float(str(v))) for v in values]
+
+
+def test_out_of_order_rows_read_back_in_range(tmp_path):
+    df = generate_log_frame("2025-07-01", 300)
+    store = BinaryLogStore(str(tmp_path / "log.bin"))
+    store.append(df.iloc[100:])
+    store.append(df.iloc[:100])
+    start, end = df["Waktu"].iloc[50], df["Waktu"].iloc[150]
+    expected = df[(df["Waktu"] >= start) & (df["Waktu"] < end)].sort_values("Waktu")
+    got = labelled_log_frame(decode_records(np.sort(store.rows(start, end), order="waktu")))
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+    store.close()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from log_binary import BinaryLogStore
+from log_parquet import ParquetLogStore
+from log_rotation import RotatingCsvLogStore
+from log_sqlite import SqliteLogStore
+from log_store import CsvLogWriter, labelled_log_frame, typed_log_frame
+from smart_data import generate_log_frame
+
+ROWS = 6000  # +/- 2,8 hari dengan interval 40 s, jadi beberapa partisi/segmen harian.
+START = "2025-07-01 18:00"
+
+
+def _open(kind, tmp_path):
+    if kind == "csv":
+        return CsvLogWriter(str(tmp_path / "log.csv"))
+    if kind == "rotating":
+        return RotatingCsvLogStore(str(tmp_path / "log.csv"), str(tmp_path / "segmen"), period="D", retention_days=0)
+    if kind == "sqlite":
+        return SqliteLogStore(str(tmp_path / "log.db"))
+    if kind == "binary":
+        return BinaryLogStore(str(tmp_path / "log.bin"))
+    return ParquetLogStore(str(tmp_path / "parquet"))
+
+
+@pytest.fixture(scope="module")
+def log_df():
+    return generate_log_frame(START, ROWS)
+
+
+@pytest.fixture(scope="module", params=["csv", "rotating", "sqlite", "binary", "parquet"])
+def store(request, log_df, tmp_path_factory):
+    store = _open(request.param, tmp_path_factory.mktemp(request.param))
+    for i in range(0, ROWS, 700):
+        store.append(log_df.iloc[i:i + 700].to_dict("records"))
+    yield store
+    if hasattr(store, "close"):
+        store.close()
+
+
+def reference_page(log_df, start=None, end=None, devices=None, offset=0, limit=50):
+    df = typed_log_frame(log_df)
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= df["waktu"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["waktu"] < pd.Timestamp(end)
+    for name, on in (devices or {}).items():
+        mask &= df[name] == on
+    newest = df[mask].sort_values("waktu", ascending=False, kind="stable")
+    return newest.iloc[offset:offset + limit], int(mask.sum())
+
+
+def assert_same_page(got, expected):
+    (page, total), (ref, ref_total) = got, expected
+    assert total == ref_total
+    pd.testing.assert_frame_equal(
+        labelled_log_frame(page).reset_index(drop=True),
+        labelled_log_frame(ref).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+CASES = [
+    dict(),
+    dict(offset=50),
+    dict(offset=ROWS - 20),
+    dict(offset=ROWS + 10),
+    dict(devices={"ac": True}),
+    dict(devices={"ac": True, "lampu": False}, offset=120, limit=30),
+    dict(devices={"tv": True, "lampu": True}, offset=1000),
+    dict(start="2025-07-02 06:00"),
+    dict(start="2025-07-02 06:00", end="2025-07-03 01:30", offset=700),
+    dict(start="2025-07-02 23:50", end="2025-07-03 00:10", devices={"ac": False}),
+    dict(start="2030-01-01"),
+]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[str(i) for i in range(len(CASES))])
+def test_page_matches_pandas(store, log_df, case):
+    args = dict(start=None, end=None, devices=None, offset=0, limit=50)
+    args.update(case)
+    assert_same_page(store.page(**args), reference_page(log_df, **args))
+
+
+def test_binary_page_after_out_of_order_append(tmp_path, log_df):
+    store = BinaryLogStore(str(tmp_path / "log.bin"))
+    store.append(log_df.iloc[2000:].to_dict("records"))
+    store.append(log_df.iloc[:2000].to_dict("records"))
+    for args in (dict(offset=3990), dict(devices={"ac": True}, offset=100), dict(start="2025-07-02")):
+        assert_same_page(store.page(**args), reference_page(log_df, **args))
+    store.close()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import threading
+
+from log_parquet import ParquetLogStore
+from smart_data import generate_log_frame
+
+
+def _fill(store, df, batch=100):
+    for i in range(0, len(df), batch):
+        store.append(df.iloc[i:i + batch])
+
+
+def test_closed_days_and_running_day_are_compacted(tmp_path):
+    df = generate_log_frame("2025-07-01 20:00", 8000)  # +/- 3,7 hari
+    store = ParquetLogStore(str(tmp_path / "p"), compact_parts=16)
+    _fill(store, df, batch=20)
+    parts = {day: len(store._parts(day)) for day in store.partitions()}
+    assert all(n == 1 for day, n in parts.items() if day != store.partitions()[-1])
+    assert parts[store.partitions()[-1]] < 16
+    assert store.count() == len(df)
+
+
+def test_append_is_not_blocked_by_open_reader(tmp_path):
+    df = generate_log_frame("2025-07-01 20:00", 3000)
+    store = ParquetLogStore(str(tmp_path / "p"), compact_parts=4)
+    _fill(store, df.iloc[:1500])
+
+    chunks = store.iter_chunks(batch_rows=50)
+    first = next(chunks)
+    # Append berikutnya ikut menggabungkan part yang sedang dibaca generator di atas.
+    writer = threading.Thread(target=_fill, args=(store, df.iloc[1500:]))
+    writer.start()
+    writer.join(timeout=10)
+    assert not writer.is_alive()
+
+    # Pembaca tetap melihat snapshot-nya secara utuh; part lama dihapus setelah selesai.
+    assert len(first) + sum(len(c) for c in chunks) == 1500
+    assert not store._retired
+    assert store.count() == len(df)
+
+
+def test_leftover_parts_after_crash_are_removed(tmp_path):
+    df = generate_log_frame("2025-07-01 00:00", 500)
+    root = str(tmp_path / "p")
+    store = ParquetLogStore(root, compact_parts=0)
+    _fill(store, df)
+    day_dir = os.path.join(root, f"tanggal={store.partitions()[0]}")
+    backup = str(tmp_path / "backup")
+    shutil.copytree(day_dir, backup)
+    store.compact()
+
+    # Crash setelah file gabungan ditulis, sebelum part lama terhapus.
+    for name in os.listdir(backup):
+        shutil.copy(os.path.join(backup, name), day_dir)
+    assert ParquetLogStore(root).count() == len(df)
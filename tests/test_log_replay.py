@@ -0,0 +1,25 @@
+import numpy as np
+
+from log_replay import STAGES, LogReplay
+from log_store import CsvLogWriter, typed_log_frame
+from smart_data import CUACA_LIST, FEATURES, generate_log_frame
+from smart_rules import RulesEngine
+
+
+def _replay(tmp_path):
+    return LogReplay(RulesEngine(FEATURES, {"cuaca": CUACA_LIST}), CsvLogWriter(str(tmp_path / "replay.csv")))
+
+
+def test_rates_for_replayed_rows(tmp_path):
+    report = _replay(tmp_path).run([typed_log_frame(generate_log_frame("2025-07-01", 300))])
+    assert report["rows"] == 300
+    assert all(report["stage_rows_per_s"][s] > 0 for s in STAGES)
+    # Aturan yang sama dengan label log sintetis: semua status cocok.
+    np.testing.assert_allclose(list(report["agree"].values()), 1.0)
+
+
+def test_empty_replay_reports_no_rates(tmp_path):
+    for chunks, limit in (([], None), ([typed_log_frame(generate_log_frame("2025-07-01", 10))], 0)):
+        report = _replay(tmp_path).run(chunks, limit)
+        assert report["rows"] == 0
+        assert report["stage_rows_per_s"] == dict.fromkeys(STAGES)
@@ -0,0 +1,96 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import log_writer
+from log_writer import BackgroundLogWriter
+from smart_data import generate_log_frame
+
+
+class FlakyStore:
+    # Gagal `failures` kali (atau selamanya bila None), lalu menyimpan baris di memori.
+    def __init__(self, path, failures=None, gate=None):
+        self.path = path
+        self.failures = failures
+        self.gate = gate
+        self.calls = 0
+        self.rows = []
+
+    def append(self, records):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait()
+        if self.failures is None or self.calls <= self.failures:
+            raise OSError(28, "No space left on device")
+        self.rows.extend(records)
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(log_writer, "RETRY_S", 0.01)
+
+
+@pytest.fixture
+def records():
+    return generate_log_frame("2025-07-01", 50).to_dict("records")
+
+
+def test_batch_is_retried_until_store_recovers(tmp_path, records):
+    store = FlakyStore(str(tmp_path / "log.csv"), failures=2)
+    committed = []
+    writer = BackgroundLogWriter(store, flush_s=0.01, on_commit=committed.extend)
+    writer.append(records)
+    assert writer.flush(timeout=5)
+    assert store.rows == records and committed == records
+    stats = writer.stats()
+    assert stats["failed_rows"] == 0 and stats["last_error"] is None
+    writer.close()
+
+
+def test_failing_batch_moves_to_side_file(tmp_path, records):
+    store = FlakyStore(str(tmp_path / "log.csv"))
+    writer = BackgroundLogWriter(store, flush_s=0.01, max_retries=3)
+    writer.append(records)
+    assert writer.flush(timeout=5)
+    assert store.calls == 3
+    assert writer.stats()["failed_rows"] == len(records)
+    assert "dipindah" in writer.stats()["last_error"]
+    spilled = pd.read_csv(writer.failed_file)
+    assert spilled["Waktu"].tolist() == [r["Waktu"] for r in records]
+    writer.close()
+
+
+def test_rows_are_counted_as_dropped_when_side_file_fails(tmp_path, records):
+    store = FlakyStore(str(tmp_path / "log.csv"))
+    writer = BackgroundLogWriter(store, flush_s=0.01, max_retries=1,
+                                 failed_file=str(tmp_path / "tidak-ada" / "gagal.csv"))
+    writer.append(records)
+    assert writer.flush(timeout=5)
+    assert writer.stats()["dropped_rows"] == len(records)
+    writer.close()
+
+
+def test_flush_and_full_queue_do_not_hang(tmp_path, records):
+    gate = threading.Event()
+    store = FlakyStore(str(tmp_path / "log.csv"), failures=0, gate=gate)
+    writer = BackgroundLogWriter(store, flush_s=0.01, flush_rows=1, maxsize=5, full_timeout=0.05)
+    writer.append(records)  # store macet: sisa yang tidak muat di antrean dipindah ke file samping
+    assert writer.flush(timeout=0.1) is False
+    spilled = writer.stats()["failed_rows"]
+    assert spilled > 0
+
+    gate.set()
+    assert writer.flush(timeout=5)
+    assert len(store.rows) + spilled == len(records)
+    writer.close()
+
+
+def test_store_without_path_needs_failed_file(tmp_path):
+    class NoPath:
+        def append(self, records):
+            pass
+
+    with pytest.raises(ValueError):
+        BackgroundLogWriter(NoPath())
+    BackgroundLogWriter(NoPath(), failed_file=str(tmp_path / "gagal.csv")).close()
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pytest
+
+import lookup_table
+from lookup_table import LookupTable, load_or_build
+
+
+@pytest.fixture
+def small_table():
+    rng = np.random.default_rng(0)
+    table = rng.integers(0, 8, (24, 2, 3, 2, 4, 5), dtype=np.uint8)
+    return LookupTable(table, ["cerah", "hujan", "mendung"], (20.0, 35.0), (0.0, 100.0), {"build_s": 1.0})
+
+
+def test_save_is_atomic_and_round_trips(tmp_path, small_table):
+    path = str(tmp_path / "lookup.npz")
+    small_table.save(path)
+    assert os.listdir(tmp_path) == ["lookup.npz"]
+    loaded = LookupTable.load(path)
+    np.testing.assert_array_equal(loaded.table, small_table.table)
+    assert loaded.report == small_table.report
+
+
+def test_truncated_file_is_rebuilt(tmp_path, small_table, monkeypatch):
+    path = str(tmp_path / "lookup.npz")
+    small_table.save(path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    monkeypatch.setattr(lookup_table, "build_lookup_table", lambda models, **kwargs: small_table)
+    lut = load_or_build(None, path)
+    assert lut is small_table
+    np.testing.assert_array_equal(LookupTable.load(path).table, small_table.table)